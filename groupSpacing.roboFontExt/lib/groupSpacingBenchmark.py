@@ -0,0 +1,310 @@
+'''
+Compare margin measurement engines against a reference, for correctness and speed.
+
+Each comparison measures the same glyphs with a reference engine and a candidate engine, and reports all glyphs whose margins differ by more than a tolerance, and the throughput of both engines. Glyphs come from a generated corpus of difficult cases (overlaps, open contours, components, curves, beams at extrema) and optionally from UFO fixtures.
+
+    python groupSpacingBenchmark.py --beam 250
+    python groupSpacingBenchmark.py MyFont.ufo --compare margins:table --json report.json
+
+The exit status is 1 if any comparison has mismatches, or if a comparison asked for with `--compare` could not run.
+
+'''
+
+import time
+import random
+from groupSpacingCore.measurement import BoundsBackend, BeamBackend, MultiBeamBackend, OpticalBackend, getMargins
+from groupSpacingCore.cache import MarginsCache
+from groupSpacingCore.profiles import setUseNumpy
+
+# ------
+# corpus
+# ------
+
+def _newFont():
+    '''Make a new font: an RFont inside RoboFont, or a fontParts font outside it.'''
+    try:
+        from mojo.roboFont import NewFont
+    except ImportError:
+        from fontParts.world import NewFont
+    return NewFont(showInterface=False)
+
+def _addGlyph(font, name, width, contours=(), components=(), openContours=()):
+    '''
+    Add a glyph to a corpus font.
+
+    Args:
+        contours (list): Closed contours as lists of `((x, y), segmentType)` points.
+        components (list): `(baseGlyph, transformation)` tuples.
+        openContours (list): Open contours as lists of `((x, y), segmentType)` points.
+
+    '''
+    glyph = font.newGlyph(name)
+    glyph.width = width
+    pen = glyph.getPointPen()
+    for points, isOpen in [(points, False) for points in contours] + [(points, True) for points in openContours]:
+        pen.beginPath()
+        for i, (pt, segmentType) in enumerate(points):
+            pen.addPoint(pt, 'move' if isOpen and i == 0 else segmentType)
+        pen.endPath()
+    for baseGlyph, transformation in components:
+        pen.addComponent(baseGlyph, transformation)
+    return glyph
+
+def _rectangle(x0, y0, x1, y1):
+    return [((x0, y0), 'line'), ((x1, y0), 'line'), ((x1, y1), 'line'), ((x0, y1), 'line')]
+
+def _ellipse(cx, cy, rx, ry):
+    k = 0.5523
+    return [
+        ((cx + rx, cy), 'curve'), ((cx + rx, cy + ry * k), None), ((cx + rx * k, cy + ry), None),
+        ((cx, cy + ry), 'curve'), ((cx - rx * k, cy + ry), None), ((cx - rx, cy + ry * k), None),
+        ((cx - rx, cy), 'curve'), ((cx - rx, cy - ry * k), None), ((cx - rx * k, cy - ry), None),
+        ((cx, cy - ry), 'curve'), ((cx + rx * k, cy - ry), None), ((cx + rx, cy - ry * k), None),
+    ]
+
+def makeCorpus(count=200, beam=250, seed=0):
+    '''
+    Generate a font with difficult cases for margin measurement, and random polygons.
+
+    Args:
+        count (int): The number of random glyphs.
+        beam (int): The height of the beam, to generate glyphs with extrema exactly at the beam.
+        seed (int): The random seed, so that runs can be compared.
+
+    '''
+    font = _newFont()
+    font.info.unitsPerEm = 1000
+    font.info.xHeight = 500
+    font.info.descender = -250
+    _addGlyph(font, 'empty', 500)
+    _addGlyph(font, 'rectangle', 500, contours=[_rectangle(50, 0, 450, 500)])
+    _addGlyph(font, 'overlap', 600, contours=[_rectangle(40, 0, 300, 500), _rectangle(200, 100, 560, 400)])
+    _addGlyph(font, 'counter', 600, contours=[_rectangle(50, 0, 550, 700), list(reversed(_rectangle(150, 100, 450, 600)))])
+    _addGlyph(font, 'open', 500, openContours=[[((60, 0), 'line'), ((250, 700), 'line'), ((440, 0), 'line')]])
+    _addGlyph(font, 'oval', 600, contours=[_ellipse(300, 250, 260, 260)])
+    _addGlyph(font, 'component', 500, components=[('rectangle', (1, 0, 0, 1, 0, 0))])
+    _addGlyph(font, 'componentShifted', 700, components=[('oval', (1, 0, 0, 1, 50, 0))])
+    _addGlyph(font, 'componentScaled', 800, components=[('overlap', (1.2, 0, 0, 1, 10, 0))])
+    _addGlyph(font, 'mixed', 900, contours=[_rectangle(600, 0, 850, 300)], components=[('oval', (1, 0, 0, 1, 0, 0))])
+    _addGlyph(font, 'beamAtTop', 500, contours=[_rectangle(50, 0, 450, beam)])
+    _addGlyph(font, 'beamAtBottom', 500, contours=[_rectangle(50, beam, 450, 700)])
+    _addGlyph(font, 'beamAtExtremum', 600, contours=[_ellipse(300, beam - 200, 250, 200)])
+    _addGlyph(font, 'beamAtVertex', 500, contours=[[((250, beam), 'line'), ((450, 0), 'line'), ((50, 0), 'line')]])
+    _addGlyph(font, 'aboveBeam', 500, contours=[_rectangle(50, beam + 100, 450, beam + 400)])
+
+    rnd = random.Random(seed)
+    for i in range(count):
+        points = []
+        for j in range(rnd.randint(3, 12)):
+            points.append(((rnd.randint(0, 600), rnd.randint(-200, 800)), 'line'))
+        _addGlyph(font, f'random{i}', rnd.randint(500, 800), contours=[points])
+
+    return font
+
+def readFixtures(ufoPath):
+    '''Open a UFO with RoboFont or fontParts, and get all glyphs in its default layer as fixtures.'''
+    try:
+        from mojo.roboFont import OpenFont
+    except ImportError:
+        from fontParts.world import OpenFont
+    font = OpenFont(ufoPath, showInterface=False)
+    return font, _getGlyphs(font)
+
+def _getGlyphs(font):
+    layer = font.defaultLayer
+    return [layer[glyphName] for glyphName in layer.keys()]
+
+# -------
+# engines
+# -------
+
+class MarginsEngine:
+
+    '''Measure margins with `getMargins`, the function used by the tool itself.'''
+
+    def __init__(self, beam=None):
+        self.beam = beam
+        self.name = 'margins' if beam is None else 'margins-beam'
+
+    def measure(self, glyphs):
+        margins = []
+        for glyph in glyphs:
+            # the beam returns None if it misses the glyph, the bounds return (None, None) for empty glyphs
+            glyphMargins = getMargins(glyph, beam=self.beam)
+            if glyphMargins is None or None in glyphMargins:
+                glyphMargins = None
+            margins.append(glyphMargins)
+        return margins
+
+class PurePythonEngine:
+
+    '''Run a profile-based backend without NumPy.'''
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = f'{backend.name}-python'
+
+    def measure(self, glyphs):
+        useNumpy = setUseNumpy(False)
+        try:
+            return self.backend.measure(glyphs)
+        finally:
+            setUseNumpy(useNumpy)
+
+class MetricsTableEngine:
+
+    '''Measure bounds margins with a `MetricsTable` snapshot.'''
+
+    name = 'table'
+
+    def measure(self, glyphs):
+        from groupSpacingCore.metrics import MetricsTable
+        if not glyphs:
+            return []
+        layer = glyphs[0].layer
+        table = MetricsTable(layer.font, layerNames=[layer.name], glyphNames=[glyph.name for glyph in glyphs])
+        lefts, rights = table.getColumn(layer.name, 'left'), table.getColumn(layer.name, 'right')
+        return [None if lefts[i] != lefts[i] else (float(lefts[i]), float(rights[i])) for i in range(len(glyphs))]
+
+engines = {
+    'margins'        : lambda font, beam: MarginsEngine(),
+    'margins-beam'   : lambda font, beam: MarginsEngine(beam),
+    'bounds'         : lambda font, beam: BoundsBackend(),
+    'table'          : lambda font, beam: MetricsTableEngine(),
+    'cache'          : lambda font, beam: MarginsCache(font, BoundsBackend()),
+    'beam'           : lambda font, beam: BeamBackend(beam),
+    'beams'          : lambda font, beam: MultiBeamBackend([beam]),
+    'beams-python'   : lambda font, beam: PurePythonEngine(MultiBeamBackend([beam])),
+    'optical'        : lambda font, beam: OpticalBackend(),
+    'optical-python' : lambda font, beam: PurePythonEngine(OpticalBackend()),
+}
+
+defaultComparisons = [
+    ('margins',        'bounds'),
+    ('margins',        'table'),
+    ('margins',        'cache'),
+    ('margins-beam',   'beam'),
+    ('beam',           'beams'),
+    ('beams-python',   'beams'),
+    ('optical-python', 'optical'),
+]
+
+# ---------
+# comparing
+# ---------
+
+def _timeEngine(engine, glyphs, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        margins = engine.measure(glyphs)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return margins, best
+
+def _isMismatch(reference, candidate, tolerance):
+    if reference is None or candidate is None:
+        return reference is not candidate
+    return any(abs(a - b) > tolerance for a, b in zip(reference, candidate))
+
+def compareEngines(reference, candidate, glyphs, tolerance=0.5, repeat=3):
+    '''
+    Measure glyphs with two engines, and compare the results.
+
+    Returns:
+        A dictionary with the mismatches as `(glyphName, referenceMargins, candidateMargins)` tuples, the best time of each engine in seconds, and the throughput of each engine in glyphs per second.
+
+    '''
+    referenceMargins, referenceTime = _timeEngine(reference, glyphs, repeat)
+    candidateMargins, candidateTime = _timeEngine(candidate, glyphs, repeat)
+
+    mismatches = []
+    for glyph, a, b in zip(glyphs, referenceMargins, candidateMargins):
+        if _isMismatch(a, b, tolerance):
+            mismatches.append((glyph.name, a, b))
+
+    return {
+        'glyphs'              : len(glyphs),
+        'mismatches'          : mismatches,
+        'referenceTime'       : referenceTime,
+        'candidateTime'       : candidateTime,
+        'referenceThroughput' : len(glyphs) / referenceTime if referenceTime else None,
+        'candidateThroughput' : len(glyphs) / candidateTime if candidateTime else None,
+        'speedup'             : referenceTime / candidateTime if candidateTime else None,
+    }
+
+def runComparisons(font, glyphs, comparisons=None, beam=250, tolerance=0.5, repeat=3):
+    '''
+    Run all comparisons over the same glyphs.
+
+    Comparisons whose engines are not available here (for example the `beam` engines outside RoboFont, or the `table` engine without NumPy) are reported as skipped.
+
+    Returns:
+        A dictionary of results by `reference:candidate` name.
+
+    '''
+    results = {}
+    for referenceName, candidateName in (comparisons if comparisons is not None else defaultComparisons):
+        key = f'{referenceName}:{candidateName}'
+        try:
+            reference = engines[referenceName](font, beam)
+            candidate = engines[candidateName](font, beam)
+            results[key] = compareEngines(reference, candidate, glyphs, tolerance=tolerance, repeat=repeat)
+        except ImportError as e:
+            results[key] = { 'skipped' : str(e) }
+    return results
+
+def printReport(results, maxMismatches=10):
+    '''Print the results of all comparisons.'''
+    for key, result in results.items():
+        if 'skipped' in result:
+            print(f'{key}: skipped ({result["skipped"]})\n')
+            continue
+        print(f"{key}: {len(result['mismatches'])} mismatches in {result['glyphs']} glyphs")
+        print(f"\treference : {result['referenceThroughput']:.0f} glyphs/s")
+        print(f"\tcandidate : {result['candidateThroughput']:.0f} glyphs/s ({result['speedup']:.2f}x)")
+        for glyphName, a, b in result['mismatches'][:maxMismatches]:
+            print(f'\t\t{glyphName}: {a} != {b}')
+        if len(result['mismatches']) > maxMismatches:
+            print(f"\t\t… {len(result['mismatches']) - maxMismatches} more")
+        print()
+
+if __name__ == '__main__':
+
+    import sys
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare margin measurement engines for correctness and speed.')
+    parser.add_argument('ufoPaths', nargs='*', help='UFOs to use as fixtures, instead of the generated corpus')
+    parser.add_argument('--compare', action='append', default=None, help='reference:candidate engine names (repeatable)')
+    parser.add_argument('--beam', type=float, default=250, help='height of the beam')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='maximum difference which is not a mismatch')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs per engine')
+    parser.add_argument('--count', type=int, default=200, help='number of random glyphs in the generated corpus')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the generated corpus')
+    parser.add_argument('--json', default=None, help='save the results to a .json file')
+    args = parser.parse_args()
+
+    comparisons = [tuple(item.split(':')) for item in args.compare] if args.compare else None
+
+    sources = []
+    if args.ufoPaths:
+        sources += [(ufoPath, *readFixtures(ufoPath)) for ufoPath in args.ufoPaths]
+    else:
+        font = makeCorpus(count=args.count, beam=args.beam, seed=args.seed)
+        sources.append(('corpus', font, _getGlyphs(font)))
+
+    report = {}
+    for sourceName, font, glyphs in sources:
+        print(f'{sourceName} ({len(glyphs)} glyphs)\n')
+        results = runComparisons(font, glyphs, comparisons=comparisons, beam=args.beam, tolerance=args.tolerance, repeat=args.repeat)
+        printReport(results)
+        report[sourceName] = results
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    failed = any(result.get('mismatches') or (args.compare and 'skipped' in result) for results in report.values() for result in results.values())
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,139 @@
+'''
+A persistent cache of measured margins, stored in the font lib or in a sidecar `.json` file.
+
+'''
+
+import os
+import json
+from groupSpacingCore.measurement import MarginsBackend
+
+__all__ = [
+    'CACHE_LIB_KEY',
+    'getGlyphHash',
+    'MarginsCache',
+]
+
+CACHE_LIB_KEY = 'com.hipertipo.groupSpacing.marginsCache'
+
+def getGlyphHash(glyph):
+    '''
+    Get a hash of a glyph’s outlines, components and width.
+
+    >>> glyph = CurrentGlyph()
+    >>> print(getGlyphHash(glyph))
+
+    '''
+    from fontTools.pens.hashPointPen import HashPointPen
+    pen = HashPointPen(glyph.width, glyph.layer)
+    glyph.drawPoints(pen)
+    return pen.hash
+
+class MarginsCache(MarginsBackend):
+
+    '''
+    A measurement backend which caches the results of another backend.
+
+    Cached margins are keyed by backend settings (with defaults taken from the font info resolved, so changing the x-height or the em size invalidates optical margins), layer and glyph name, and store a hash of the glyph they were measured from. The hash is checked lazily when a glyph is measured again, so outdated entries are simply measured again.
+
+    The cache is read from the font lib, or from a sidecar file if `filePath` is given, and is written back with `save`.
+
+    >>> font = CurrentFont()
+    >>> backend = getMeasurementBackend('optical')
+    >>> cache = MarginsCache(font, backend)
+    >>> print(getMargins(font['n'], backend=cache))
+    >>> cache.save()
+
+    '''
+
+    def __init__(self, font, backend, filePath=None):
+        self.font = font
+        self.backend = backend
+        self.filePath = filePath
+        self.name = backend.name
+        self.settingsKey = self._getSettingsKey()
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def getSettings(self):
+        return self.backend.getSettings()
+
+    def getFontSettings(self, font):
+        return self.backend.getFontSettings(font)
+
+    def _getSettingsKey(self):
+        return json.dumps(self.backend.getFontSettings(self.font), sort_keys=True)
+
+    def _checkSettings(self):
+        '''Switch to the entries for the current settings, if the font info they depend on was changed.'''
+        settingsKey = self._getSettingsKey()
+        if settingsKey == self.settingsKey:
+            return
+        if self._changed:
+            self._data = dict(self._data, **{ self.settingsKey : self._layers })
+        self.settingsKey = settingsKey
+        self._layers = { layerName : dict(entries) for layerName, entries in self._data.get(settingsKey, {}).items() }
+
+    def load(self):
+        '''Read the cached margins from the sidecar file or from the font lib.'''
+        if self.filePath is not None:
+            if os.path.exists(self.filePath):
+                with open(self.filePath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            else:
+                data = {}
+        else:
+            data = self.font.lib.get(CACHE_LIB_KEY, {})
+        # entries for other settings are kept as they are, and written back on save
+        self._data = data
+        self._layers = { layerName : dict(entries) for layerName, entries in data.get(self.settingsKey, {}).items() }
+        self._changed = False
+
+    def save(self):
+        '''Write the cached margins to the sidecar file or to the font lib. Entries for other settings are kept.'''
+        if not self._changed:
+            return
+        data = { key : value for key, value in self._data.items() if key != self.settingsKey }
+        data[self.settingsKey] = self._layers
+        if self.filePath is not None:
+            with open(self.filePath, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        else:
+            self.font.lib[CACHE_LIB_KEY] = data
+        self._data = data
+        self._changed = False
+
+    def clear(self):
+        '''Remove all cached margins for the current settings.'''
+        self._layers = {}
+        self._changed = True
+
+    def measure(self, glyphs):
+        self._checkSettings()
+        results = [None] * len(glyphs)
+        missing = []
+
+        for i, glyph in enumerate(glyphs):
+            glyphHash = getGlyphHash(glyph)
+            entry = self._layers.get(glyph.layer.name, {}).get(glyph.name)
+            if entry is not None and entry[0] == glyphHash:
+                # glyphs which cannot be measured are stored without margins
+                results[i] = tuple(entry[1:]) if len(entry) == 3 else None
+                self.hits += 1
+            else:
+                missing.append((i, glyphHash))
+
+        if not missing:
+            return results
+
+        measured = self.backend.measure([glyphs[i] for i, glyphHash in missing])
+        self.misses += len(missing)
+
+        for (i, glyphHash), margins in zip(missing, measured):
+            glyph = glyphs[i]
+            entry = [glyphHash] + list(margins) if margins is not None else [glyphHash]
+            self._layers.setdefault(glyph.layer.name, {})[glyph.name] = entry
+            results[i] = tuple(margins) if margins is not None else None
+
+        self._changed = True
+        return results
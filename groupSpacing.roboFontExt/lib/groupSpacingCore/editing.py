@@ -0,0 +1,232 @@
+'''
+Edit many spacing groups at once, and commit all changes as a single batch.
+
+'''
+
+from groupSpacingCore.groups import SpacingGroupsIndex, getGroupSide
+
+__all__ = [
+    'GroupsChange',
+    'SpacingGroupsEditor',
+]
+
+def _setGroups(font, groups):
+    '''Write groups to a font, posting a single notification when possible.'''
+    naked = font.naked() if hasattr(font, 'naked') else None
+    if naked is not None:
+        naked.groups.holdNotifications()
+    try:
+        for groupName, glyphNames in groups.items():
+            if glyphNames is None:
+                if groupName in font.groups:
+                    del font.groups[groupName]
+            else:
+                font.groups[groupName] = list(glyphNames)
+    finally:
+        if naked is not None:
+            naked.groups.releaseHeldNotifications()
+
+class GroupsChange:
+
+    '''
+    A committed batch of group edits, which can be reverted and reapplied.
+
+    Only the previous and new contents of the changed groups are stored. Removed groups are stored as None. The edits which made the change are kept in `operations`, as `[methodName, *args]` lists, so they can be replayed in other fonts with `SpacingGroupsEditor.replay`.
+
+    '''
+
+    def __init__(self, font, before, after, title=None, operations=None):
+        self.font = font
+        self.before = before
+        self.after = after
+        self.title = title
+        self.operations = operations if operations is not None else []
+
+    def __len__(self):
+        return len(self.after)
+
+    def revert(self):
+        '''Restore all changed groups to their previous contents.'''
+        _setGroups(self.font, self.before)
+
+    def reapply(self):
+        '''Apply all group changes again.'''
+        _setGroups(self.font, self.after)
+
+class SpacingGroupsEditor:
+
+    '''
+    Add, remove and move glyphs between spacing groups, and rename, split and merge groups.
+
+    All edits are made on a working copy of the spacing groups and its index. Nothing is written to the font until `commit`, which writes all changed groups in one batch, with a single notification. The returned change can be added to a `SpacingUndoStack`.
+
+    Glyphs are kept in at most one spacing group per side: adding a glyph to a group removes it from its previous group on the same side.
+
+    >>> font = CurrentFont()
+    >>> with SpacingGroupsEditor(font) as editor:
+    >>>     editor.addGlyphs('public.kern2.n', ['m', 'r', 'h'])
+    >>>     editor.mergeGroups(['public.kern1.o', 'public.kern1.c'], 'public.kern1.o')
+    >>> undoStack.push(editor.change)
+
+    '''
+
+    def __init__(self, font, index=None, title=None):
+        self.font = font
+        self.title = title
+        self.index = index if index is not None else SpacingGroupsIndex(font.groups)
+        self._before = {}
+        self._operations = []
+        self.change = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        if exceptionType is None:
+            self.commit()
+
+    # -------
+    # helpers
+    # -------
+
+    def _setGroup(self, groupName, glyphNames):
+        if groupName not in self._before:
+            group = self.index.groups.get(groupName)
+            self._before[groupName] = tuple(group) if group is not None else None
+        if glyphNames:
+            self.index.setGroup(groupName, glyphNames)
+        else:
+            self.index.removeGroup(groupName)
+
+    def _checkSide(self, groupName, otherName):
+        if getGroupSide(groupName) is None:
+            raise ValueError(f"'{groupName}' is not a spacing group name")
+        if getGroupSide(groupName) != getGroupSide(otherName):
+            raise ValueError(f"'{groupName}' and '{otherName}' are spacing groups for different sides")
+
+    def _removeFromGroups(self, glyphNames, side):
+        removed = {}
+        for glyphName in glyphNames:
+            groupName = self.index.getGroup(glyphName, side)
+            if groupName is not None:
+                removed.setdefault(groupName, set()).add(glyphName)
+        for groupName, names in removed.items():
+            self._setGroup(groupName, [glyphName for glyphName in self.index.groups[groupName] if glyphName not in names])
+
+    # -------
+    # editing
+    # -------
+
+    def _addGlyphs(self, groupName, glyphNames):
+        self._checkSide(groupName, groupName)
+        side = getGroupSide(groupName)
+        glyphNames = [glyphName for glyphName in glyphNames if self.index.getGroup(glyphName, side) != groupName]
+        self._removeFromGroups(glyphNames, side)
+        self._setGroup(groupName, list(self.index.groups.get(groupName, [])) + glyphNames)
+
+    def addGlyphs(self, groupName, glyphNames):
+        '''Add glyphs to a spacing group, creating the group if needed. Glyphs are removed from their previous group on the same side.'''
+        self._addGlyphs(groupName, glyphNames)
+        self._operations.append(['addGlyphs', groupName, list(glyphNames)])
+
+    def removeGlyphs(self, glyphNames, side):
+        '''Remove glyphs from their spacing groups on one side. Groups left empty are removed.'''
+        self._removeFromGroups(glyphNames, side)
+        self._operations.append(['removeGlyphs', list(glyphNames), side])
+
+    def moveGlyphs(self, glyphNames, groupName):
+        '''Move glyphs from their current groups to another spacing group on the same side.'''
+        self.addGlyphs(groupName, glyphNames)
+
+    def renameGroup(self, groupName, newGroupName):
+        '''Rename a spacing group. Both names must be for the same side.'''
+        self._checkSide(groupName, newGroupName)
+        if groupName not in self.index.groups:
+            raise KeyError(groupName)
+        if newGroupName in self.index.groups:
+            raise ValueError(f"group '{newGroupName}' already exists")
+        glyphNames = list(self.index.groups[groupName])
+        self._setGroup(groupName, None)
+        self._setGroup(newGroupName, glyphNames)
+        self._operations.append(['renameGroup', groupName, newGroupName])
+
+    def splitGroup(self, groupName, glyphNames, newGroupName):
+        '''Move some glyphs from a spacing group into a new group.'''
+        self._checkSide(groupName, newGroupName)
+        if groupName not in self.index.groups:
+            raise KeyError(groupName)
+        group = self.index.groups[groupName]
+        self._addGlyphs(newGroupName, [glyphName for glyphName in glyphNames if glyphName in group])
+        self._operations.append(['splitGroup', groupName, list(glyphNames), newGroupName])
+
+    def mergeGroups(self, groupNames, newGroupName):
+        '''Merge several spacing groups into one. The merged groups are removed.'''
+        glyphNames = []
+        for groupName in groupNames:
+            self._checkSide(groupName, newGroupName)
+            if groupName not in self.index.groups:
+                raise KeyError(groupName)
+            glyphNames += self.index.groups[groupName]
+        for groupName in groupNames:
+            if groupName != newGroupName:
+                self._setGroup(groupName, None)
+        self._addGlyphs(newGroupName, list(dict.fromkeys(glyphNames)))
+        self._operations.append(['mergeGroups', list(groupNames), newGroupName])
+
+    def replay(self, operations):
+        '''
+        Apply edits recorded in another font's `GroupsChange.operations`.
+
+        Only the glyphs named in each edit are touched. Glyphs which are not in the font are ignored, and edits of groups which do not exist in the font are skipped.
+
+        Returns:
+            The number of edits which were applied.
+
+        '''
+        # the position of the glyph names argument of each edit
+        glyphArguments = { 'addGlyphs' : 1, 'removeGlyphs' : 0, 'renameGroup' : None, 'splitGroup' : 1, 'mergeGroups' : None }
+        count = 0
+        for operation in operations:
+            method, args = operation[0], list(operation[1:])
+            if method not in glyphArguments:
+                raise ValueError(f"unknown group edit '{method}'")
+            i = glyphArguments[method]
+            if i is not None:
+                args[i] = [glyphName for glyphName in args[i] if glyphName in self.font]
+            try:
+                getattr(self, method)(*args)
+            except (KeyError, ValueError):
+                continue
+            count += 1
+        return count
+
+    # ----------
+    # committing
+    # ----------
+
+    def commit(self):
+        '''
+        Write all changed groups to the font in a single batch.
+
+        Returns:
+            A `GroupsChange` which can be reverted and reapplied, or None if nothing was changed.
+
+        '''
+        before = {}
+        after = {}
+        for groupName, glyphNames in self._before.items():
+            group = self.index.groups.get(groupName)
+            group = tuple(group) if group is not None else None
+            if group == glyphNames:
+                continue
+            before[groupName] = glyphNames
+            after[groupName] = group
+        self._before = {}
+        operations, self._operations = self._operations, []
+
+        if not after:
+            return
+
+        _setGroups(self.font, after)
+        self.change = GroupsChange(self.font, before, after, title=self.title, operations=operations)
+        return self.change
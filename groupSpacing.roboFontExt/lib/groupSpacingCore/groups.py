@@ -0,0 +1,222 @@
+'''
+Spacing groups: names, sides, key glyphs and a reverse index of glyphs to groups.
+
+'''
+
+__all__ = [
+    'PREFIX_LEFTSIDE',
+    'PREFIX_RIGHTSIDE',
+    'getGroupsForGlyph',
+    'SpacingGroupsIndex',
+    'getKeyGlyph',
+    'getGroupSide',
+    'getSiblings',
+    'getGroupName',
+    'makeGroup',
+    'getSpacingGroups',
+]
+
+PREFIX_LEFTSIDE  = 'public.kern2.'
+PREFIX_RIGHTSIDE = 'public.kern1.'
+
+def getGroupsForGlyph(glyph):
+    '''
+    Get left and right spacing groups for a glyph.
+
+    Returns:
+        A tuple with left and right spacing groups. Each spacing group can be the name of the group (str) or None.
+
+    >>> glyph = CurrentGlyph()
+    >>> print(getGroupsForGlyph(glyph))
+    ('com.hipertipo.groupSpacing.leftSide.n', 'com.hipertipo.groupSpacing.rightSide.n')
+
+    '''
+    font = glyph.font
+
+    groupsLeftSide = []
+    groupsRightSide = []
+
+    for groupName in font.groups.keys():
+        group = font.groups[groupName]
+
+        if groupName.startswith(PREFIX_LEFTSIDE):
+            if glyph.name in group:
+                groupsLeftSide.append(groupName)
+
+        if groupName.startswith(PREFIX_RIGHTSIDE):
+            if glyph.name in group:
+                groupsRightSide.append(groupName)
+
+    if len(groupsLeftSide) > 1 or len(groupsLeftSide) > 1:
+        print('glyph is in more than one group: %s' % ' '.join(groupsLeftSide))
+
+    groupLeftSide = groupsLeftSide[0] if groupsLeftSide else None
+    groupRightSide = groupsRightSide[0] if groupsRightSide else None
+
+    return groupLeftSide, groupRightSide
+
+class SpacingGroupsIndex:
+
+    '''
+    A reverse index of spacing groups, mapping each glyph name to its left and right spacing groups.
+
+    Build it once per font and reuse it for many lookups, instead of scanning all groups for every glyph.
+
+    >>> font = CurrentFont()
+    >>> index = SpacingGroupsIndex(font.groups)
+    >>> print(index.getGroupsForGlyph('n'))
+    ('public.kern2.n', 'public.kern1.n')
+    >>> print(index.getSiblings('n', 'right'))
+
+    '''
+
+    def __init__(self, groups):
+        self.groups = {}
+        # glyph name → spacing groups containing the glyph, in the order they were added
+        self._leftSide = {}
+        self._rightSide = {}
+        for groupName in groups.keys():
+            if groupName.startswith(PREFIX_LEFTSIDE) or groupName.startswith(PREFIX_RIGHTSIDE):
+                self.setGroup(groupName, groups[groupName])
+
+    def _getSideMap(self, groupName):
+        if groupName.startswith(PREFIX_LEFTSIDE):
+            return self._leftSide
+        if groupName.startswith(PREFIX_RIGHTSIDE):
+            return self._rightSide
+
+    def setGroup(self, groupName, glyphNames):
+        '''Add or replace a spacing group in the index.'''
+        sideMap = self._getSideMap(groupName)
+        if sideMap is None:
+            return
+        self.removeGroup(groupName)
+        self.groups[groupName] = list(glyphNames)
+        for glyphName in glyphNames:
+            sideMap.setdefault(glyphName, {})[groupName] = None
+
+    def removeGroup(self, groupName):
+        '''Remove a spacing group from the index.'''
+        if groupName not in self.groups:
+            return
+        sideMap = self._getSideMap(groupName)
+        for glyphName in self.groups.pop(groupName):
+            # the glyph falls back to the next group containing it, if any
+            groupNames = sideMap.get(glyphName)
+            if groupNames is None:
+                continue
+            groupNames.pop(groupName, None)
+            if not groupNames:
+                del sideMap[glyphName]
+
+    def _getFirstGroup(self, sideMap, glyphName):
+        groupNames = sideMap.get(glyphName)
+        if not groupNames:
+            return None
+        return next(iter(groupNames))
+
+    def getGroupsForGlyph(self, glyphName):
+        '''Get a tuple with the left and right spacing groups of a glyph.'''
+        return self._getFirstGroup(self._leftSide, glyphName), self._getFirstGroup(self._rightSide, glyphName)
+
+    def getGroup(self, glyphName, side):
+        '''Get the name of the left or right spacing group of a glyph.'''
+        if side == 'right':
+            return self._getFirstGroup(self._rightSide, glyphName)
+        return self._getFirstGroup(self._leftSide, glyphName)
+
+    def getSiblings(self, glyphName, side):
+        '''Get all glyphs in the same left or right spacing group of a glyph.'''
+        groupName = self.getGroup(glyphName, side)
+        if groupName is None:
+            return []
+        return list(self.groups[groupName])
+
+def getKeyGlyph(groupName, glyphNames):
+    '''
+    Get the key glyph of a spacing group, from which margins are copied to all other glyphs in the group.
+
+    The key glyph is the glyph after which the group is named (as created with `makeGroup`), or the first glyph in the group.
+
+    >>> font = CurrentFont()
+    >>> print(getKeyGlyph('public.kern2.n', font.groups['public.kern2.n']))
+    n
+
+    '''
+    for prefix in [PREFIX_LEFTSIDE, PREFIX_RIGHTSIDE]:
+        if groupName.startswith(prefix):
+            glyphName = groupName[len(prefix):]
+            if glyphName in glyphNames:
+                return glyphName
+    if glyphNames:
+        return glyphNames[0]
+
+def getGroupSide(groupName):
+    '''Get the side of a spacing group from its name: `left`, `right`, or None if not a spacing group.'''
+    if groupName.startswith(PREFIX_LEFTSIDE):
+        return 'left'
+    if groupName.startswith(PREFIX_RIGHTSIDE):
+        return 'right'
+
+def getSiblings(glyph, side, index=None):
+    '''
+    Get all glyphs in the same left or right spacing group of a given glyph.
+
+    Args:
+        glyph (RGlyph): A glyph object.
+        side (str): The side of the spacing group: `left` or `right`.
+        index (SpacingGroupsIndex or None): A prebuilt index of the font’s spacing groups. (optional)
+
+    >>> glyph = CurrentGlyph()
+    >>> side = ['left', 'right'][0]
+    >>> print(glyph.name, side, getSiblings(glyph, side))
+
+    '''
+    if index is not None:
+        return index.getSiblings(glyph.name, side)
+
+    groupLeftSide, groupRightSide = getGroupsForGlyph(glyph)
+
+    if side == 'right':
+        siblings = list(glyph.font.groups[groupRightSide]) if groupRightSide is not None else []
+    else:
+        siblings = list(glyph.font.groups[groupLeftSide]) if groupLeftSide is not None else []
+
+    # if glyph.name in siblings:
+    #     siblings.remove(glyph.name)
+    
+    return siblings
+
+def getGroupName(glyphName, side):
+    '''Get the name of a left or right spacing group named after a glyph.'''
+    prefix = PREFIX_LEFTSIDE if side == 'left' else PREFIX_RIGHTSIDE
+    return prefix + glyphName
+
+def makeGroup(font, glyphName, side):
+    '''
+    Make a new spacing group containing a single glyph.
+
+    Returns:
+        The name of the new group, or None if the group already exists.
+
+    >>> font = CurrentFont()
+    >>> makeGroup(font, 'n', 'left')
+    'public.kern2.n'
+
+    '''
+    groupName = getGroupName(glyphName, side)
+    if groupName in font.groups:
+        return
+    font.groups[groupName] = [glyphName]
+    return groupName
+
+def getSpacingGroups(font):
+    '''
+    Get all spacing groups in the font as a dictionary.
+
+    >>> font = CurrentFont()
+    >>> spacingGroups = getSpacingGroups()
+    >>> print(spacingGroups.keys())
+
+    '''
+    return { groupName : font.groups[groupName] for groupName in font.groups.keys() if groupName.startswith(PREFIX_LEFTSIDE) or groupName.startswith(PREFIX_RIGHTSIDE) }
@@ -0,0 +1,184 @@
+'''
+A columnar snapshot of glyph metrics, for computing spacing group changes for a whole font with NumPy.
+
+'''
+
+from groupSpacingCore.groups import SpacingGroupsIndex, getKeyGlyph, getGroupSide
+from groupSpacingCore.profiles import _getNumpy
+from groupSpacingCore.undo import shiftMargin
+
+__all__ = [
+    'MetricsTable',
+]
+
+class MetricsTable:
+
+    '''
+    Widths, bounds and margins of many glyphs in many layers, stored as NumPy arrays indexed by glyph id.
+
+    Glyphs are measured once, when the table is created. The margins of all spacing groups can then be compared with vectorized array operations, and only glyphs which actually change are written back to the font.
+
+    Each layer has the columns `width`, `xMin`, `xMax`, `left` and `right`. Glyphs which are missing or empty in a layer are stored as NaN. If a measurement backend is given, `left` and `right` are measured with it instead of from the bounds.
+
+    Requires NumPy.
+
+    >>> font = CurrentFont()
+    >>> table = MetricsTable(font, layerNames=font.layerOrder)
+    >>> plan = table.planGroupDeltas()
+    >>> table.apply(plan)
+
+    '''
+
+    columns = ['width', 'xMin', 'xMax', 'left', 'right']
+
+    def __init__(self, font, layerNames=None, glyphNames=None, backend=None):
+        self.numpy = _getNumpy()
+        if self.numpy is None:
+            raise ImportError('MetricsTable requires NumPy')
+        self.font = font
+        self.backend = backend
+        self.layerNames = list(layerNames) if layerNames is not None else [font.defaultLayer.name]
+        self.glyphNames = list(glyphNames) if glyphNames is not None else list(font.defaultLayer.keys())
+        self.glyphIds = { glyphName : i for i, glyphName in enumerate(self.glyphNames) }
+        self.layers = {}
+        for layerName in self.layerNames:
+            self.layers[layerName] = { column : self.numpy.full(len(self.glyphNames), self.numpy.nan) for column in self.columns }
+            self.update(self.glyphNames, [layerName])
+
+    def __len__(self):
+        return len(self.glyphNames)
+
+    def getColumn(self, layerName, column):
+        '''Get one column of a layer as an array.'''
+        return self.layers[layerName][column]
+
+    def update(self, glyphNames, layerNames=None):
+        '''Measure the given glyphs again.'''
+        numpy = self.numpy
+        for layerName in (layerNames if layerNames is not None else self.layerNames):
+            layer = self.font.getLayer(layerName)
+            table = self.layers[layerName]
+            ids, glyphs, rows = [], [], []
+            for glyphName in glyphNames:
+                i = self.glyphIds[glyphName]
+                table['width'][i] = table['xMin'][i] = table['xMax'][i] = table['left'][i] = table['right'][i] = numpy.nan
+                if glyphName not in layer:
+                    continue
+                glyph = layer[glyphName]
+                table['width'][i] = glyph.width
+                bounds = glyph.bounds
+                if bounds is None:
+                    continue
+                ids.append(i)
+                glyphs.append(glyph)
+                rows.append((bounds[0], bounds[2]))
+            if not ids:
+                continue
+            ids = numpy.array(ids)
+            rows = numpy.array(rows, dtype=float)
+            table['xMin'][ids] = rows[:, 0]
+            table['xMax'][ids] = rows[:, 1]
+            if self.backend is None:
+                table['left'][ids] = rows[:, 0]
+                table['right'][ids] = table['width'][ids] - rows[:, 1]
+            else:
+                margins = [m if m is not None else (numpy.nan, numpy.nan) for m in self.backend.measure(glyphs)]
+                margins = numpy.array(margins, dtype=float)
+                table['left'][ids] = margins[:, 0]
+                table['right'][ids] = margins[:, 1]
+
+    # --------
+    # planning
+    # --------
+
+    def getGroupPairs(self, index=None, groupNames=None):
+        '''
+        Get the key and member glyph ids of spacing groups as flat arrays.
+
+        Returns:
+            A tuple of `(keyIds, memberIds, rightSide)` arrays, with one item per group member (excluding key glyphs).
+
+        '''
+        numpy = self.numpy
+        if index is None:
+            index = SpacingGroupsIndex(self.font.groups)
+        keyIds, memberIds, rightSide = [], [], []
+        for groupName in (groupNames if groupNames is not None else index.groups):
+            glyphNames = [glyphName for glyphName in index.groups.get(groupName, []) if glyphName in self.glyphIds]
+            keyName = getKeyGlyph(groupName, glyphNames)
+            if keyName is None:
+                continue
+            side = getGroupSide(groupName)
+            for glyphName in glyphNames:
+                if glyphName == keyName:
+                    continue
+                keyIds.append(self.glyphIds[keyName])
+                memberIds.append(self.glyphIds[glyphName])
+                rightSide.append(side == 'right')
+        return numpy.array(keyIds, dtype=int), numpy.array(memberIds, dtype=int), numpy.array(rightSide, dtype=bool)
+
+    def planGroupDeltas(self, index=None, groupNames=None, layerNames=None, tolerance=0):
+        '''
+        Compute the margin changes needed to bring all spacing groups in sync with their key glyphs.
+
+        Args:
+            index (SpacingGroupsIndex or None): Group lookups. (optional)
+            groupNames (list or None): Plan only these groups. Defaults to all spacing groups.
+            layerNames (list or None): Plan only these layers. Defaults to all layers in the table.
+            tolerance (int): Differences up to this value are ignored.
+
+        Returns:
+            A list of `(glyphName, layerName, side, delta)` records.
+
+        '''
+        numpy = self.numpy
+        keyIds, memberIds, rightSide = self.getGroupPairs(index=index, groupNames=groupNames)
+        plan = []
+        if not len(keyIds):
+            return plan
+        for layerName in (layerNames if layerNames is not None else self.layerNames):
+            table = self.layers[layerName]
+            deltas = numpy.where(rightSide, table['right'][keyIds] - table['right'][memberIds], table['left'][keyIds] - table['left'][memberIds])
+            changed = numpy.flatnonzero(~numpy.isnan(deltas) & (numpy.abs(deltas) > tolerance))
+            for i in changed:
+                side = 'right' if rightSide[i] else 'left'
+                plan.append((self.glyphNames[memberIds[i]], layerName, side, float(deltas[i])))
+        return plan
+
+    # -------
+    # writing
+    # -------
+
+    def apply(self, plan, undo=None):
+        '''
+        Write planned margin changes to the font, and update the changed rows of the table.
+
+        Args:
+            plan (list): `(glyphName, layerName, side, delta)` records, as returned by `planGroupDeltas`.
+            undo (SpacingUndo or None): Record changes as margin deltas. (optional)
+
+        Returns:
+            A list of `(glyphName, layerName, difference)` tuples.
+
+        '''
+        deltas = []
+        for glyphName, layerName, side, delta in plan:
+            glyph = self.font.getLayer(layerName)[glyphName]
+            shiftMargin(glyph, side, delta)
+            glyph.changed()
+            if undo is not None:
+                undo.add(glyphName, layerName, side, delta)
+
+            table = self.layers.get(layerName)
+            if table is not None:
+                i = self.glyphIds[glyphName]
+                table['width'][i] += delta
+                if side == 'left':
+                    table['xMin'][i] += delta
+                    table['xMax'][i] += delta
+                    table['left'][i] += delta
+                else:
+                    table['right'][i] += delta
+
+            deltas.append((glyphName, layerName, delta))
+        return deltas
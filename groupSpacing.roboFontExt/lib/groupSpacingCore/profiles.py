@@ -0,0 +1,172 @@
+'''
+Side profiles of glyph outlines, measured without RoboFont.
+
+Outlines are flattened into line segments once, and then intersected with many horizontal lines at the same time. If NumPy is available, all intersections of a glyph are computed as array operations.
+
+'''
+
+from fontTools.pens.basePen import BasePen
+
+__all__ = [
+    'SegmentsPen',
+    'getGlyphSegments',
+    'getSideProfile',
+    'getProfileHeights',
+    'setUseNumpy',
+]
+
+_numpy = False
+_useNumpy = True
+
+def _getNumpy():
+    '''Import NumPy on first use. Returns None if NumPy is not available.'''
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = None
+    return _numpy
+
+def setUseNumpy(value):
+    '''
+    Use NumPy for side profiles if it is available (the default), or always use the pure Python implementation.
+
+    Returns:
+        The previous setting.
+
+    >>> previous = setUseNumpy(False)
+    >>> lefts, rights = getSideProfile(segments, ys)
+    >>> setUseNumpy(previous)
+
+    '''
+    global _useNumpy
+    previous = _useNumpy
+    _useNumpy = bool(value)
+    return previous
+
+class SegmentsPen(BasePen):
+
+    '''
+    A pen which collects the outlines of a glyph as a flat list of line segments.
+
+    Curves are approximated with `steps` line segments each. Components are decomposed using the glyph set, if one is given.
+
+    '''
+
+    def __init__(self, glyphSet=None, steps=8):
+        super().__init__(glyphSet)
+        self.steps = steps
+        self.segments = []
+        self._start = None
+
+    def _moveTo(self, pt):
+        self._start = pt
+
+    def _lineTo(self, pt):
+        self.segments.append((self._getCurrentPoint(), pt))
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        (x0, y0) = self._getCurrentPoint()
+        (x1, y1), (x2, y2), (x3, y3) = pt1, pt2, pt3
+        previous = x0, y0
+        for i in range(1, self.steps + 1):
+            t = i / self.steps
+            mt = 1 - t
+            a, b, c, d = mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t
+            point = a * x0 + b * x1 + c * x2 + d * x3, a * y0 + b * y1 + c * y2 + d * y3
+            self.segments.append((previous, point))
+            previous = point
+
+    def _qCurveToOne(self, pt1, pt2):
+        (x0, y0) = self._getCurrentPoint()
+        (x1, y1), (x2, y2) = pt1, pt2
+        previous = x0, y0
+        for i in range(1, self.steps + 1):
+            t = i / self.steps
+            mt = 1 - t
+            a, b, c = mt * mt, 2 * mt * t, t * t
+            point = a * x0 + b * x1 + c * x2, a * y0 + b * y1 + c * y2
+            self.segments.append((previous, point))
+            previous = point
+
+    def _closePath(self):
+        current = self._getCurrentPoint()
+        if self._start is not None and current != self._start:
+            self.segments.append((current, self._start))
+        self._start = None
+
+    def _endPath(self):
+        self._start = None
+
+def getGlyphSegments(glyph, steps=8):
+    '''
+    Get the outlines of a glyph (including components) as a list of line segments.
+
+    >>> glyph = CurrentGlyph()
+    >>> segments = getGlyphSegments(glyph)
+
+    '''
+    pen = SegmentsPen(glyph.layer, steps=steps)
+    glyph.draw(pen)
+    return pen.segments
+
+def getSideProfile(segments, ys):
+    '''
+    Intersect outline segments with horizontal lines.
+
+    Args:
+        segments (list): A list of line segments, as returned by `getGlyphSegments`.
+        ys (list): The heights of the horizontal lines.
+
+    Returns:
+        Two lists with the leftmost and rightmost intersection at each height. Heights which do not intersect any contour are None.
+
+    >>> glyph = CurrentGlyph()
+    >>> lefts, rights = getSideProfile(getGlyphSegments(glyph), [100, 200, 300])
+
+    '''
+    if segments and _useNumpy and _getNumpy() is not None:
+        return _getSideProfileNumpy(segments, ys)
+
+    lefts, rights = [], []
+    for y in ys:
+        xs = []
+        for (x0, y0), (x1, y1) in segments:
+            if y0 == y1:
+                continue
+            if min(y0, y1) <= y < max(y0, y1):
+                xs.append(x0 + (y - y0) * (x1 - x0) / (y1 - y0))
+        lefts.append(min(xs) if xs else None)
+        rights.append(max(xs) if xs else None)
+    return lefts, rights
+
+def _getSideProfileNumpy(segments, ys):
+    numpy = _getNumpy()
+    S = numpy.array(segments, dtype=float).reshape(-1, 4)
+    X0, Y0, X1, Y1 = S[:, 0], S[:, 1], S[:, 2], S[:, 3]
+    dY = Y1 - Y0
+    valid = dY != 0
+    X0, Y0, X1, dY = X0[valid], Y0[valid], X1[valid], dY[valid]
+    yMin = numpy.minimum(Y0, Y0 + dY)
+    yMax = numpy.maximum(Y0, Y0 + dY)
+
+    Y = numpy.asarray(ys, dtype=float)[:, None]
+    hit = (yMin <= Y) & (Y < yMax)
+    X = X0 + (Y - Y0) * (X1 - X0) / dY
+
+    lefts = numpy.where(hit, X, numpy.inf).min(axis=1)
+    rights = numpy.where(hit, X, -numpy.inf).max(axis=1)
+    found = hit.any(axis=1)
+
+    lefts = [float(x) if f else None for x, f in zip(lefts, found)]
+    rights = [float(x) if f else None for x, f in zip(rights, found)]
+    return lefts, rights
+
+def getProfileHeights(font, count=16):
+    '''Get evenly distributed heights between the descender and the ascender of a font.'''
+    yMin = font.info.descender or 0
+    yMax = font.info.ascender or (yMin + (font.info.unitsPerEm or 1000))
+    step = (yMax - yMin) / count
+    return [yMin + step * (i + 0.5) for i in range(count)]
@@ -0,0 +1,271 @@
+'''
+Copy margins between glyphs in spacing groups, and check groups for glyphs out of sync.
+
+'''
+
+from groupSpacingCore.groups import getKeyGlyph, getGroupSide, SpacingGroupsIndex
+from groupSpacingCore.measurement import BoundsBackend, BeamBackend
+from groupSpacingCore.undo import shiftMargin
+
+__all__ = [
+    'copyMargins',
+    'copyMarginsBatch',
+    'checkSpacingGroup',
+    'auditSpacingGroups',
+]
+
+def copyMargins(glyph, siblings, side, beam=None, allLayers=False, verbose=True, layerNames=None, backend=None, undo=None, presence=None):
+    '''
+    Copy left or right margin from one glyph to all other glyphs in the same spacing group.
+
+    Args:
+        glyph (RGlyph): The glyph from which the margin will be copied.
+        siblings (list): A list of names of other glyphs in the same spacing group.
+        side (str): The side of the spacing group: `left` or `right`.
+        beam (int or None): A beam to measure the margins. (optional)
+        allLayers (bool): Copy margins in all layers of the font.
+        verbose (bool): Print information when copying margins.
+        layerNames (list or None): Names of the layers in which to copy margins. Overrides `allLayers`. (optional)
+        backend (MarginsBackend or None): A backend to measure the margins. Overrides `beam`. (optional)
+        undo (SpacingUndo or None): Record changes as margin deltas, instead of using the glyph undo. (optional)
+        presence (LayerPresenceIndex or None): Skip layers in which siblings have no outlines, without loading them. (optional)
+
+    Returns:
+        A list of `(glyphName, layerName, difference)` tuples, one for each sibling which was changed.
+
+    >>> side = 'right'
+    >>> glyph = CurrentGlyph()
+    >>> siblings = getSiblings(glyph, side)
+    >>> spaceCenter = CurrentSpaceCenter()
+    >>> copyMargins(glyph, siblings, side, beam=spaceCenter.beam())
+
+    '''
+    if backend is None:
+        backend = BeamBackend(beam) if beam is not None else BoundsBackend()
+
+    margins = backend.measure([glyph])[0]
+    if margins is None:
+        return []
+
+    left, right = margins
+
+    font = glyph.font
+    if not font:
+        return []
+
+    siblings = [glyphName for glyphName in siblings if glyphName != glyph.name]
+
+    if layerNames is None:
+        layerNames = font.layerOrder if allLayers else [glyph.layer.name]
+
+    if verbose:
+        print(f"transferring {side} margins…\n")
+        print(f"\tvalue   : {right if side == 'right' else left} {'' if backend.name == 'bounds' else f'({backend.name})'}")
+        print(f"\tlayers  : {' '.join(layerNames)}")
+        print(f"\tsource  : {glyph.name}")
+        print(f"\ttargets : {' '.join(siblings)}")
+        print()
+
+    deltas = []
+
+    for layerName in layerNames:
+
+        # if verbose:
+        #     print(f'\t{layerName}')
+
+        glyphs = []
+        if presence is not None:
+            # only glyphs with outlines in this layer, without touching any others
+            layer = font.getLayer(layerName)
+            glyphs = [layer[glyphName] for _, glyphName in presence.iterPairs(siblings, [layerName])]
+
+        else:
+            for glyphName in siblings:
+                if glyphName not in font:
+                    continue
+
+                sibling = font[glyphName].getLayer(layerName)
+
+                if sibling.bounds is None:
+                    continue
+
+                glyphs.append(sibling)
+
+        if not glyphs:
+            continue
+
+        # measure all siblings in one batch
+        for sibling, siblingMargins in zip(glyphs, backend.measure(glyphs)):
+
+            if siblingMargins is None:
+                continue
+
+            # if verbose:
+            #     print(f'\t\tcopying {side} margin from {glyph.name} to {sibling.name}...')
+
+            leftSibling, rightSibling = siblingMargins
+            difference = right - rightSibling if side == 'right' else left - leftSibling
+
+            if not difference:
+                continue
+
+            # glyph undo is only available inside RoboFont
+            canUndo = undo is None and hasattr(sibling, 'prepareUndo')
+            if canUndo:
+                sibling.prepareUndo()
+
+            # same as setting the margin, without measuring the bounds again
+            shiftMargin(sibling, side, difference)
+
+            if canUndo:
+                sibling.performUndo()
+            sibling.changed()
+
+            if undo is not None:
+                undo.add(sibling.name, layerName, side, difference)
+
+            deltas.append((sibling.name, layerName, difference))
+
+        # if verbose:
+        #     print()
+
+    if verbose:
+        print('...done.\n')
+
+    return deltas
+
+def copyMarginsBatch(glyphs, side, index=None, beam=None, allLayers=False, verbose=True, layerNames=None, backend=None, undo=None, presence=None):
+    '''
+    Copy the margins of several key glyphs to the other glyphs in their spacing groups, as one change.
+
+    The groups of all key glyphs are resolved in a single pass. If two key glyphs are in the same group, the group is skipped and reported as a conflict. All margin changes are recorded in the same `SpacingUndo`, and font notifications are held until all groups are done.
+
+    Args:
+        glyphs (list): The key glyphs.
+        side (str): The side of the spacing groups.
+        index (SpacingGroupsIndex or None): Group lookups. (optional)
+
+    Other arguments are the same as in `copyMargins`.
+
+    Returns:
+        A tuple with a dictionary of `(glyphName, layerName, difference)` lists by key glyph name, and a dictionary of conflicting key glyph names by group name.
+
+    >>> font = CurrentFont()
+    >>> glyphs = [font[glyphName] for glyphName in 'HOnoabdpq']
+    >>> undo = SpacingUndo(font, 'copy margins')
+    >>> results, conflicts = copyMarginsBatch(glyphs, 'left', undo=undo)
+
+    '''
+    if not glyphs:
+        return {}, {}
+
+    font = glyphs[0].font
+    if index is None:
+        index = SpacingGroupsIndex(font.groups)
+
+    keys = {}
+    for glyph in glyphs:
+        groupName = index.getGroup(glyph.name, side)
+        if groupName is None:
+            continue
+        keys.setdefault(groupName, {})[glyph.name] = glyph
+
+    conflicts = { groupName : list(groupKeys) for groupName, groupKeys in keys.items() if len(groupKeys) > 1 }
+    if verbose:
+        for groupName, keyNames in conflicts.items():
+            print(f"skipping {groupName}: more than one key glyph ({' '.join(keyNames)})\n")
+
+    naked = font.naked() if hasattr(font, 'naked') else None
+    if naked is not None:
+        naked.dispatcher.holdNotifications()
+
+    results = {}
+    try:
+        for groupName, groupKeys in keys.items():
+            if groupName in conflicts:
+                continue
+            keyName, glyph = list(groupKeys.items())[0]
+            results[keyName] = copyMargins(glyph, index.groups[groupName], side, beam=beam, allLayers=allLayers, verbose=verbose, layerNames=layerNames, backend=backend, undo=undo, presence=presence)
+    finally:
+        if naked is not None:
+            naked.dispatcher.releaseHeldNotifications()
+
+    return results, conflicts
+
+def checkSpacingGroup(layer, groupName, glyphNames, backend=None, tolerance=0, margins=None):
+    '''
+    Compare the margins of all glyphs in a spacing group with the margin of the group’s key glyph.
+
+    Args:
+        layer (RLayer): The layer in which to measure the glyphs.
+        groupName (str): The name of the spacing group.
+        glyphNames (list): The names of the glyphs in the group.
+        backend (MarginsBackend or None): A backend to measure the margins. (optional)
+        tolerance (int or float): The maximum difference which is considered in sync.
+        margins (dict or None): Margins which were already measured, by glyph name. (optional)
+
+    Returns:
+        A list of `(glyphName, difference)` tuples for all glyphs which are out of sync.
+
+    '''
+    side = getGroupSide(groupName)
+    keyName = getKeyGlyph(groupName, glyphNames)
+    glyphNames = [glyphName for glyphName in glyphNames if glyphName in layer]
+    if side is None or keyName not in glyphNames:
+        return []
+
+    if margins is None:
+        if backend is None:
+            backend = BoundsBackend()
+        glyphs = [layer[glyphName] for glyphName in glyphNames]
+        margins = dict(zip(glyphNames, backend.measure(glyphs)))
+
+    i = 1 if side == 'right' else 0
+    keyMargins = margins.get(keyName)
+    if keyMargins is None:
+        return []
+
+    outOfSync = []
+    for glyphName in glyphNames:
+        glyphMargins = margins.get(glyphName)
+        if glyphName == keyName or glyphMargins is None:
+            continue
+        difference = keyMargins[i] - glyphMargins[i]
+        if abs(difference) > tolerance:
+            outOfSync.append((glyphName, difference))
+    return outOfSync
+
+def auditSpacingGroups(font, layerName=None, backend=None, index=None, tolerance=0):
+    '''
+    Find all spacing groups with glyphs whose margins differ from the group’s key glyph.
+
+    All group members in the layer are measured in a single batch. Use a `MarginsCache` as backend to reuse margins measured in previous sessions.
+
+    Returns:
+        A dictionary with group names as keys and lists of `(glyphName, difference)` tuples as values.
+
+    >>> font = CurrentFont()
+    >>> cache = MarginsCache(font, getMeasurementBackend('bounds'))
+    >>> print(auditSpacingGroups(font, backend=cache))
+
+    '''
+    if index is None:
+        index = SpacingGroupsIndex(font.groups)
+    if backend is None:
+        backend = BoundsBackend()
+
+    layer = font.getLayer(layerName) if layerName else font.defaultLayer
+
+    glyphNames = []
+    for groupName, groupGlyphs in index.groups.items():
+        glyphNames += [glyphName for glyphName in groupGlyphs if glyphName in layer]
+    glyphNames = list(dict.fromkeys(glyphNames))
+    glyphs = [layer[glyphName] for glyphName in glyphNames]
+    margins = dict(zip(glyphNames, backend.measure(glyphs)))
+
+    results = {}
+    for groupName, groupGlyphs in index.groups.items():
+        outOfSync = checkSpacingGroup(layer, groupName, groupGlyphs, tolerance=tolerance, margins=margins)
+        if outOfSync:
+            results[groupName] = outOfSync
+    return results
@@ -0,0 +1,161 @@
+'''
+Keep track of spacing groups with glyphs out of sync, without measuring the whole font again after each change.
+
+'''
+
+from groupSpacingCore.groups import SpacingGroupsIndex, getGroupSide
+from groupSpacingCore.measurement import BoundsBackend
+from groupSpacingCore.spacing import checkSpacingGroup
+from groupSpacingCore.undo import shiftMargin
+
+__all__ = [
+    'SpacingGroupsTracker',
+]
+
+class SpacingGroupsTracker:
+
+    '''
+    An incremental tracker of spacing groups which are out of sync with their key glyph.
+
+    Changed glyphs and groups only mark the affected groups as dirty. Dirty groups are measured again the next time the out-of-sync groups are requested, so many changes in a row cost nothing until then.
+
+    >>> font = CurrentFont()
+    >>> tracker = SpacingGroupsTracker(font)
+    >>> tracker.startObserving()
+    >>> print(tracker.getOutOfSyncGroups())
+    >>> tracker.fixOutOfSyncGroups()
+    >>> tracker.stopObserving()
+
+    '''
+
+    def __init__(self, font, layerName=None, backend=None, tolerance=0):
+        self.font = font
+        self.layerName = layerName if layerName is not None else font.defaultLayer.name
+        self.backend = backend if backend is not None else BoundsBackend()
+        self.tolerance = tolerance
+        self.index = SpacingGroupsIndex(font.groups)
+        self._dirty = set(self.index.groups)
+        self._outOfSync = {}
+        self._observing = False
+
+    # -------
+    # changes
+    # -------
+
+    def glyphChanged(self, glyphName, layerName=None):
+        '''Mark the spacing groups of a changed glyph as dirty.'''
+        if layerName is not None and layerName != self.layerName:
+            return
+        for groupName in self.index.getGroupsForGlyph(glyphName):
+            if groupName is not None:
+                self._dirty.add(groupName)
+
+    def groupsChanged(self):
+        '''Update the index after the font’s groups were changed, and mark new or changed spacing groups as dirty.'''
+        oldGroups = self.index.groups
+        self.index = SpacingGroupsIndex(self.font.groups)
+        for groupName, glyphNames in self.index.groups.items():
+            if oldGroups.get(groupName) != glyphNames:
+                self._dirty.add(groupName)
+        for groupName in set(oldGroups) - set(self.index.groups):
+            self._dirty.discard(groupName)
+            self._outOfSync.pop(groupName, None)
+
+    def setBackend(self, backend):
+        '''Use a different measurement backend, and mark all groups as dirty.'''
+        self.backend = backend
+        self._dirty = set(self.index.groups)
+
+    @property
+    def dirtyGroups(self):
+        '''The names of all groups which need to be checked again.'''
+        return set(self._dirty)
+
+    # --------
+    # checking
+    # --------
+
+    def update(self):
+        '''Check all dirty groups again.'''
+        if not self._dirty:
+            return
+        layer = self.font.getLayer(self.layerName)
+        for groupName in self._dirty:
+            if groupName not in self.index.groups:
+                continue
+            outOfSync = checkSpacingGroup(layer, groupName, self.index.groups[groupName], backend=self.backend, tolerance=self.tolerance)
+            if outOfSync:
+                self._outOfSync[groupName] = outOfSync
+            else:
+                self._outOfSync.pop(groupName, None)
+        self._dirty = set()
+
+    def getOutOfSyncGroups(self):
+        '''
+        Get all spacing groups with glyphs out of sync.
+
+        Returns:
+            A dictionary with group names as keys and lists of `(glyphName, difference)` tuples as values.
+
+        '''
+        self.update()
+        return dict(self._outOfSync)
+
+    def fixOutOfSyncGroups(self, groupNames=None, undo=None):
+        '''
+        Copy the key glyph margin to all glyphs which are out of sync.
+
+        Args:
+            groupNames (list or None): Fix only these groups. (optional)
+            undo (SpacingUndo or None): Record changes as margin deltas. (optional)
+
+        Returns:
+            A list of `(glyphName, layerName, difference)` tuples.
+
+        '''
+        self.update()
+        layer = self.font.getLayer(self.layerName)
+        deltas = []
+        for groupName, outOfSync in list(self._outOfSync.items()):
+            if groupNames is not None and groupName not in groupNames:
+                continue
+            side = getGroupSide(groupName)
+            for glyphName, difference in outOfSync:
+                glyph = layer[glyphName]
+                shiftMargin(glyph, side, difference)
+                glyph.changed()
+                if undo is not None:
+                    undo.add(glyphName, self.layerName, side, difference)
+                deltas.append((glyphName, self.layerName, difference))
+            del self._outOfSync[groupName]
+        return deltas
+
+    # ---------
+    # observers
+    # ---------
+
+    def startObserving(self):
+        '''Update the tracker automatically when glyphs or groups are changed.'''
+        if self._observing:
+            return
+        dispatcher = self.font.naked().dispatcher
+        dispatcher.addObserver(self, '_glyphChangedNotification', 'Glyph.Changed')
+        dispatcher.addObserver(self, '_groupsChangedNotification', 'Groups.Changed')
+        self._observing = True
+
+    def stopObserving(self):
+        '''Stop updating the tracker automatically.'''
+        if not self._observing:
+            return
+        dispatcher = self.font.naked().dispatcher
+        dispatcher.removeObserver(self, 'Glyph.Changed')
+        dispatcher.removeObserver(self, 'Groups.Changed')
+        self._observing = False
+
+    def _glyphChangedNotification(self, notification):
+        glyph = notification.object
+        layer = glyph.layer
+        self.glyphChanged(glyph.name, layer.name if layer is not None else None)
+
+    def _groupsChangedNotification(self, notification):
+        self.groupsChanged()
@@ -0,0 +1,149 @@
+'''
+Undo and redo group spacing changes by storing only margin deltas.
+
+'''
+
+__all__ = [
+    'shiftMargin',
+    'SpacingUndo',
+    'SpacingUndoStack',
+    'registerUndo',
+]
+
+def shiftMargin(glyph, side, delta):
+    '''
+    Add a value to the left or right margin of a glyph, without measuring its bounds.
+
+    >>> glyph = CurrentGlyph()
+    >>> shiftMargin(glyph, 'left', 10)
+
+    '''
+    if side == 'left':
+        glyph.moveBy((delta, 0))
+    glyph.width += delta
+
+class SpacingUndo:
+
+    '''
+    A group spacing change stored as `(glyphName, layerName, side, delta)` records.
+
+    Memory scales with the number of changed margins, not with the size of the outlines. Margins are reverted and reapplied by shifting the glyphs back and forth by the same deltas. Use `registerUndo` to undo the change with Cmd-Z.
+
+    >>> font = CurrentFont()
+    >>> undo = SpacingUndo(font, 'copy margins')
+    >>> copyMargins(glyph, siblings, 'left', undo=undo)
+    >>> undo.revert()
+    >>> undo.reapply()
+
+    '''
+
+    def __init__(self, font, title=None):
+        self.font = font
+        self.title = title
+        self.records = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, glyphName, layerName, side, delta):
+        '''Record a margin change.'''
+        self.records.append((glyphName, layerName, side, delta))
+
+    def _apply(self, records, sign):
+        for glyphName, layerName, side, delta in records:
+            layer = self.font.getLayer(layerName)
+            if glyphName not in layer:
+                continue
+            glyph = layer[glyphName]
+            shiftMargin(glyph, side, sign * delta)
+            glyph.changed()
+
+    def revert(self):
+        '''Revert all recorded margin changes, in reverse order.'''
+        self._apply(reversed(self.records), -1)
+
+    def reapply(self):
+        '''Apply all recorded margin changes again.'''
+        self._apply(self.records, 1)
+
+def registerUndo(change, undoManager, target, callback=None):
+    '''
+    Register a change with an `NSUndoManager`, so that it is undone and redone with Cmd-Z and Shift-Cmd-Z like any other edit in the font.
+
+    Only the change itself is kept by the undo manager – no copies of the glyphs.
+
+    Args:
+        change: Any object with `revert` and `reapply` methods, and a `title`.
+        undoManager (NSUndoManager): The undo manager of the font document.
+        target (NSObject): The object the undo actions are registered for, usually the font document.
+        callback (callable or None): Called with the change after it was reverted or reapplied. (optional)
+
+    >>> font = CurrentFont()
+    >>> document = font.document()
+    >>> registerUndo(undo, document.undoManager(), document)
+
+    '''
+    if not change:
+        return
+
+    def undo(target):
+        change.revert()
+        undoManager.registerUndoWithTarget_handler_(target, redo)
+        if callback is not None:
+            callback(change)
+
+    def redo(target):
+        change.reapply()
+        undoManager.registerUndoWithTarget_handler_(target, undo)
+        if callback is not None:
+            callback(change)
+
+    undoManager.registerUndoWithTarget_handler_(target, undo)
+    if change.title:
+        undoManager.setActionName_(change.title)
+
+class SpacingUndoStack:
+
+    '''
+    A stack of changes which can be undone and redone.
+
+    Changes can be any objects with `revert` and `reapply` methods.
+
+    '''
+
+    def __init__(self, maxSize=100):
+        self.maxSize = maxSize
+        self._undo = []
+        self._redo = []
+
+    def push(self, change):
+        '''Add a new change to the stack. Clears all changes which could be redone.'''
+        if not change:
+            return
+        self._undo.append(change)
+        del self._undo[:-self.maxSize]
+        self._redo = []
+
+    def canUndo(self):
+        return bool(self._undo)
+
+    def canRedo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        '''Revert the last change. Returns the change, or None if there is nothing to undo.'''
+        if not self._undo:
+            return
+        change = self._undo.pop()
+        change.revert()
+        self._redo.append(change)
+        return change
+
+    def redo(self):
+        '''Reapply the last undone change. Returns the change, or None if there is nothing to redo.'''
+        if not self._redo:
+            return
+        change = self._redo.pop()
+        change.reapply()
+        self._undo.append(change)
+        return change
@@ -1,15 +1,20 @@
-from importlib import reload
-import groupSpacingLib
-reload(groupSpacingLib)
-
-from vanilla import FloatingWindow, RadioGroup, Button, CheckBox, Slider, TextBox
+from Foundation import NSTimer
+from vanilla import FloatingWindow, RadioGroup, Button, CheckBox, Slider, TextBox, PopUpButton, List
 from mojo.events import addObserver, removeObserver
 from mojo.drawingTools import *
 from mojo.roboFont import CurrentGlyph, CurrentFont
 from mojo.UI import CurrentSpaceCenter, PutFile, GetFile, getDefault
 from defconAppKit.windows.baseWindow import BaseWindowController
 
-from groupSpacingLib import *
+from groupSpacingCore.groups import getSiblings, getGroupName
+from groupSpacingCore.measurement import getMeasurementBackend
+from groupSpacingCore.spacing import copyMargins, copyMarginsBatch
+from groupSpacingCore.files import exportSpacingGroups, importSpacingGroups
+from groupSpacingCore.undo import SpacingUndo, SpacingUndoStack, registerUndo
+from groupSpacingCore.tracker import SpacingGroupsTracker
+from groupSpacingCore.editing import SpacingGroupsEditor
+from groupSpacingCore.layers import LayerPresenceIndex
+from groupSpacingJournal import SpacingJournal
 
 class GroupSpacingWindow(BaseWindowController):
 
@@ -19,16 +24,37 @@ class GroupSpacingWindow(BaseWindowController):
     - works with the selected glyph in the Space Center
     - shows a preview of all other glyphs in the same spacing group
     - transfer margins from current glyph to all glyphs in the same spacing group
-    - supports measurements using the current beam
+    - or from all glyphs in the Space Center line at once
+    - supports measurements using the bounds, the current beam, multiple beams or optical margins
+    - records all spacing actions in a journal which can be replayed in other fonts
+    - keeps a live list of spacing groups with glyphs out of sync
 
     '''
 
+    # seconds without drawing before the out-of-sync list is updated
+    outOfSyncDelay = 0.5
+
+    measurements = [
+        ('bounds',     'bounds'),
+        ('beam',       'beam'),
+        ('multi-beam', 'beams'),
+        ('optical',    'optical'),
+    ]
+
     def __init__(self):
         padding = 10
         lineHeight = 20
         buttonHeight = 20
         width = 123
-        height  = lineHeight * 6 + buttonHeight * 4 + padding * 9
+        listHeight = 80
+        height  = lineHeight * 8 + buttonHeight * 7 + padding * 13 + listHeight
+
+        self.journal = SpacingJournal()
+        self.undoStack = SpacingUndoStack()
+        self._trackers = {}
+        self._layerPresence = {}
+        self._outOfSyncGroups = []
+        self._outOfSyncTimer = None
 
         self.w = FloatingWindow((width, height), title='spacing')
 
@@ -55,11 +81,30 @@ class GroupSpacingWindow(BaseWindowController):
                 callback=self.copySpacingCallback,
                 sizeStyle='small')
 
+        y += buttonHeight
+        self.w.allGlyphs = CheckBox(
+                (x, y, -padding, lineHeight),
+                'all glyphs',
+                sizeStyle='small')
+
+        y += lineHeight + padding
+        buttonWidth = (width - padding * 3) / 2
+        self.w.undoButton = Button(
+                (x, y, buttonWidth, buttonHeight),
+                'undo',
+                callback=self.undoCallback,
+                sizeStyle='small')
+        self.w.redoButton = Button(
+                (x + buttonWidth + padding, y, -padding, buttonHeight),
+                'redo',
+                callback=self.redoCallback,
+                sizeStyle='small')
+
         y += buttonHeight + padding
-        self.w.useBeam = CheckBox(
+        self.w.measurement = PopUpButton(
                 (x, y, -padding, lineHeight),
-                'use beam',
-                callback=self.useBeamCallback,
+                [label for label, name in self.measurements],
+                callback=self.measurementCallback,
                 sizeStyle='small')
 
         y += lineHeight
@@ -83,6 +128,25 @@ class GroupSpacingWindow(BaseWindowController):
                 sizeStyle='small')
 
         y += lineHeight + padding
+        self.w.outOfSyncLabel = TextBox(
+                (x, y, -padding, lineHeight),
+                'out of sync: 0',
+                sizeStyle='small')
+
+        y += lineHeight
+        self.w.outOfSync = List(
+                (x, y, -padding, listHeight),
+                [],
+                doubleClickCallback=self.outOfSyncDoubleClickCallback)
+
+        y += listHeight + padding
+        self.w.fixOutOfSyncButton = Button(
+                (x, y, -padding, buttonHeight),
+                'fix out of sync',
+                callback=self.fixOutOfSyncCallback,
+                sizeStyle='small')
+
+        y += buttonHeight + padding
         self.w.exportButton = Button(
                 (x, y, -padding, buttonHeight),
                 'export…',
@@ -96,6 +160,13 @@ class GroupSpacingWindow(BaseWindowController):
                 callback=self.importCallback,
                 sizeStyle='small')
 
+        y += buttonHeight + padding
+        self.w.saveJournalButton = Button(
+                (x, y, -padding, buttonHeight),
+                'save journal…',
+                callback=self.saveJournalCallback,
+                sizeStyle='small')
+
         y += buttonHeight + padding
         self.w.verbose = CheckBox(
                 (x, y, -padding, lineHeight),
@@ -117,16 +188,27 @@ class GroupSpacingWindow(BaseWindowController):
         '''The selected spacing group side.'''
         return ['left', 'right'][int(self.w.side.get())]
 
+    @property
+    def measurement(self):
+        '''The name of the measurement backend. Value taken from the popup button.'''
+        label, name = self.measurements[self.w.measurement.get()]
+        return name
+
     @property
     def useBeam(self):
-        '''Use or not the beam to measure margins. Value taken from the checkbox.'''
-        return self.w.useBeam.get()
+        '''Use or not the beam to measure margins.'''
+        return self.measurement == 'beam'
 
     @property
     def allLayers(self):
         '''Set margins in all layers. Value taken from the checkbox.'''
         return self.w.allLayers.get()
 
+    @property
+    def allGlyphs(self):
+        '''Use all glyphs in the Space Center as key glyphs. Value taken from the checkbox.'''
+        return self.w.allGlyphs.get()
+
     @property
     def beam(self):
         '''The beam’s y position in the Space Center.'''
@@ -145,12 +227,70 @@ class GroupSpacingWindow(BaseWindowController):
         '''Output action info to the console.'''
         return self.w.verbose.get()
 
+    def getBackend(self, font):
+        '''Get a measurement backend for the given font, according to the selected measurement.'''
+        if self.measurement == 'beam':
+            if self.beam is None:
+                return
+            return getMeasurementBackend('beam', beam=self.beam)
+        if self.measurement == 'beams':
+            xHeight = font.info.xHeight or 500
+            return getMeasurementBackend('beams', beams=[xHeight * i / 6 for i in range(1, 6)])
+        return getMeasurementBackend(self.measurement)
+
+    def getTracker(self, font):
+        '''Get the out-of-sync tracker for the given font, creating it if needed.'''
+        key = font.naked()
+        if key not in self._trackers:
+            tracker = SpacingGroupsTracker(font, backend=self.getBackend(font))
+            tracker.startObserving()
+            self._trackers[key] = tracker
+        return self._trackers[key]
+
+    def getLayerPresence(self, font):
+        '''Get the index of glyphs with outlines in each layer of the given font, creating it if needed.'''
+        key = font.naked()
+        if key not in self._layerPresence:
+            presence = LayerPresenceIndex(font)
+            presence.startObserving()
+            self._layerPresence[key] = presence
+        return self._layerPresence[key]
+
+    def updateTrackerBackend(self, tracker):
+        '''Measure with the current beam, if it was moved since the tracker’s backend was made.'''
+        backend = self.getBackend(tracker.font)
+        if backend is not None and backend.getSettings() != tracker.backend.getSettings():
+            tracker.setBackend(backend)
+
+    def updateOutOfSync(self, font):
+        '''Update the list of spacing groups with glyphs out of sync.'''
+        if font is None:
+            return
+        tracker = self.getTracker(font)
+        self.updateTrackerBackend(tracker)
+        groupNames = sorted(tracker.getOutOfSyncGroups())
+        if groupNames == self._outOfSyncGroups:
+            return
+        self._outOfSyncGroups = groupNames
+        self.w.outOfSyncLabel.set(f'out of sync: {len(groupNames)}')
+        self.w.outOfSync.set(groupNames)
+
+    def scheduleOutOfSyncUpdate(self, font):
+        '''Update the list of spacing groups with glyphs out of sync once the Space Center stops redrawing, instead of while drawing.'''
+        if self._outOfSyncTimer is not None:
+            self._outOfSyncTimer.invalidate()
+        self._outOfSyncTimer = NSTimer.scheduledTimerWithTimeInterval_repeats_block_(self.outOfSyncDelay, False, lambda timer: self._outOfSyncTimerFired(font))
+
+    def _outOfSyncTimerFired(self, font):
+        self._outOfSyncTimer = None
+        self.updateOutOfSync(font)
+
     # ---------
     # callbacks
     # ---------
 
     def makeGroupCallback(self, sender):
-        '''Make a new spacing group with the selected glyph.'''
+        '''Make a new spacing group with the selected glyph. The glyph is moved out of its previous group on the same side.'''
 
         glyph = CurrentGlyph()
         if not glyph:
@@ -159,14 +299,24 @@ class GroupSpacingWindow(BaseWindowController):
         if glyph.font is None:
             return
 
-        prefix = PREFIX_LEFTSIDE if self.side == 'left' else PREFIX_RIGHTSIDE
-        groupName = prefix + glyph.name
-        if not groupName in glyph.font.groups:
-            glyph.font.groups[groupName] = [glyph.name]
+        font = glyph.font
+        groupName = getGroupName(glyph.name, self.side)
+        if groupName in font.groups:
+            return
+
+        editor = SpacingGroupsEditor(font, title='make group')
+        editor.addGlyphs(groupName, [glyph.name])
+        change = editor.commit()
+        self.pushUndo(change)
+        self.journal.recordEditGroups(change)
 
     def copySpacingCallback(self, sender):
         '''Copy margin from current glyph to other glyphs in left/right spacing class.'''
 
+        if self.allGlyphs:
+            self.copySpaceCenterGlyphs()
+            return
+
         glyph = CurrentGlyph()
 
         if not glyph:
@@ -178,20 +328,135 @@ class GroupSpacingWindow(BaseWindowController):
         if glyph.font is None:
             return
 
-        siblings = getSiblings(glyph, self.side)
+        siblings = getSiblings(glyph, self.side, index=self.getTracker(glyph.font).index)
 
         if not siblings:
             return
 
         beam = self.beam if self.useBeam else None
-        copyMargins(glyph, siblings, self.side, beam=beam, allLayers=self.allLayers, verbose=self.verbose)
+        backend = self.getBackend(glyph.font)
+        layerNames = glyph.font.layerOrder if self.allLayers else [glyph.layer.name]
+        undo = SpacingUndo(glyph.font, 'copy margins')
+        presence = self.getLayerPresence(glyph.font) if self.allLayers else None
+        deltas = copyMargins(glyph, siblings, self.side, beam=beam, verbose=self.verbose, layerNames=layerNames, backend=backend, undo=undo, presence=presence)
+        self.pushUndo(undo)
+        self.updateOutOfSync(glyph.font)
+        self.journal.recordCopyMargins(glyph.name, glyph.layer.name, self.side, beam, layerNames, self.allLayers, deltas, backend=backend)
+
+    def getSpaceCenterLayer(self, font, S):
+        '''The layer shown in the Space Center, or else the layer of the current glyph, or else the default layer.'''
+        layerName = S.getLayerName() if hasattr(S, 'getLayerName') else None
+        if layerName is None:
+            glyph = CurrentGlyph()
+            if glyph is not None and glyph.font == font:
+                layerName = glyph.layer.name
+        if layerName not in font.layerOrder:
+            return font.defaultLayer
+        return font.getLayer(layerName)
+
+    def copySpaceCenterGlyphs(self):
+        '''Copy margins from all glyphs in the Space Center (in all lines of text) to the other glyphs in their spacing groups, as one change.'''
+
+        font = CurrentFont()
+        S = CurrentSpaceCenter()
+        if font is None or not S:
+            return
 
-    def useBeamCallback(self, sender):
-        '''Show/hide the beam according to checkbox selection.'''
+        layer = self.getSpaceCenterLayer(font, S)
+        glyphNames = list(dict.fromkeys(glyphName for glyphName in S.get() if glyphName in layer))
+        glyphs = [layer[glyphName] for glyphName in glyphNames]
+        glyphs = [glyph for glyph in glyphs if glyph.bounds is not None]
+        if not glyphs:
+            return
+
+        beam = self.beam if self.useBeam else None
+        backend = self.getBackend(font)
+        layerNames = font.layerOrder if self.allLayers else [layer.name]
+        undo = SpacingUndo(font, 'copy margins')
+        presence = self.getLayerPresence(font) if self.allLayers else None
+        results, conflicts = copyMarginsBatch(glyphs, self.side, index=self.getTracker(font).index, beam=beam, verbose=self.verbose, layerNames=layerNames, backend=backend, undo=undo, presence=presence)
+        self.pushUndo(undo)
+        self.updateOutOfSync(font)
+        for glyphName, deltas in results.items():
+            self.journal.recordCopyMargins(glyphName, layer.name, self.side, beam, layerNames, self.allLayers, deltas, backend=backend)
+
+        if conflicts:
+            print('key glyphs in the same spacing group (not copied):')
+            for groupName, keyNames in sorted(conflicts.items()):
+                print(f"\t{groupName}: {' '.join(keyNames)}")
+            print()
+
+    def fixOutOfSyncCallback(self, sender):
+        '''Copy the key glyph margins to all glyphs out of sync, in all dirty groups.'''
+        font = CurrentFont()
+        if font is None:
+            return
+        undo = SpacingUndo(font, 'fix out of sync')
+        self.getTracker(font).fixOutOfSyncGroups(undo=undo)
+        self.pushUndo(undo)
+        self.updateOutOfSync(font)
+        self.updateViewsCallback(sender)
+
+    def outOfSyncDoubleClickCallback(self, sender):
+        '''Show all glyphs in the selected group in the Space Center.'''
+        font = CurrentFont()
+        S = CurrentSpaceCenter()
+        if font is None or not S:
+            return
+        selection = sender.getSelection()
+        if not selection:
+            return
+        groupName = self._outOfSyncGroups[selection[0]]
+        S.set(list(font.groups[groupName]))
+
+    def getUndoManager(self, font):
+        '''The undo manager of the font document, or None if the font has no document.'''
+        document = font.document() if font is not None and hasattr(font, 'document') else None
+        if document is None:
+            return None, None
+        return document.undoManager(), document
+
+    def pushUndo(self, change):
+        '''Make a change undoable with Cmd-Z and with the undo/redo buttons, in a single history.'''
+        undoManager, document = self.getUndoManager(change.font)
+        if undoManager is None:
+            self.undoStack.push(change)
+            return
+        registerUndo(change, undoManager, document, callback=lambda change: self.updateOutOfSync(change.font))
+
+    def undoCallback(self, sender):
+        '''Revert the last change in the current font.'''
+        undoManager, document = self.getUndoManager(CurrentFont())
+        if undoManager is not None:
+            if undoManager.canUndo():
+                undoManager.undo()
+        else:
+            change = self.undoStack.undo()
+            if change is not None:
+                self.updateOutOfSync(change.font)
+        self.updateViewsCallback(sender)
+
+    def redoCallback(self, sender):
+        '''Reapply the last reverted change in the current font.'''
+        undoManager, document = self.getUndoManager(CurrentFont())
+        if undoManager is not None:
+            if undoManager.canRedo():
+                undoManager.redo()
+        else:
+            change = self.undoStack.redo()
+            if change is not None:
+                self.updateOutOfSync(change.font)
+        self.updateViewsCallback(sender)
+
+    def measurementCallback(self, sender):
+        '''Show/hide the beam according to the selected measurement.'''
+        for tracker in self._trackers.values():
+            tracker.setBackend(self.getBackend(tracker.font))
+        self.updateOutOfSync(CurrentFont())
         S = CurrentSpaceCenter()
         if not S:
             return
-        value = sender.get()
+        value = self.useBeam
         options = S.glyphLineView.getDisplayStates()
         options['Beam'] = value
         S.glyphLineView.setDisplayStates(options)
@@ -208,10 +473,23 @@ class GroupSpacingWindow(BaseWindowController):
         filePath = GetFile(message='import spacing groups', fileTypes=['json'])
         importSpacingGroups(font, filePath)
 
+    def saveJournalCallback(self, sender):
+        '''Save the journal of spacing actions to .json file.'''
+        filePath = PutFile(message='save spacing journal', fileName='spacingJournal.json')
+        if not filePath:
+            return
+        self.journal.save(filePath)
+
     def windowCloseCallback(self, sender):
         '''Remove observers when closing window.'''
         super().windowCloseCallback(sender)
         removeObserver(self, "spaceCenterDraw")
+        if self._outOfSyncTimer is not None:
+            self._outOfSyncTimer.invalidate()
+        for tracker in self._trackers.values():
+            tracker.stopObserving()
+        for presence in self._layerPresence.values():
+            presence.stopObserving()
 
     def updateViewsCallback(self, sender):
         '''Update the Space Center.'''
@@ -233,7 +511,9 @@ class GroupSpacingWindow(BaseWindowController):
         if font is None:
             return
 
-        siblings = getSiblings(glyph, self.side)
+        self.scheduleOutOfSyncUpdate(font)
+
+        siblings = getSiblings(glyph, self.side, index=self.getTracker(glyph.font).index)
         if not siblings:
             return
 
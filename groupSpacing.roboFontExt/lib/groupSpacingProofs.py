@@ -0,0 +1,234 @@
+'''
+Render proofs of all spacing groups in a font to SVG (or PNG) files, without RoboFont.
+
+Each proof shows the same overlay as the Space Center: the key glyph, a side indicator, and all other glyphs in the group drawn translucent and aligned by the group’s side.
+
+    python groupSpacingProofs.py MyFont.ufo proofs/ --sheet proofs/contactSheet.svg
+
+'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+from groupSpacingCore.groups import SpacingGroupsIndex, getKeyGlyph, getGroupSide
+
+def getGlyphPath(glyph):
+    '''Get the outlines of a glyph (including components) as SVG path data.'''
+    from fontTools.pens.svgPathPen import SVGPathPen
+    pen = SVGPathPen(glyph.layer)
+    glyph.draw(pen)
+    return pen.getCommands()
+
+def collectGroupProofs(font, layerName=None, groupNames=None):
+    '''
+    Collect all data needed to render spacing group proofs, as plain Python objects.
+
+    The outlines of each glyph are converted to SVG path data only once, and shared by all groups which contain the glyph.
+
+    Returns:
+        A tuple with a list of `(groupName, side, keyName, glyphNames)` tuples, a dictionary of `(pathData, width)` tuples by glyph name, and a dictionary with the font’s vertical metrics.
+
+    '''
+    layer = font.getLayer(layerName) if layerName else font.defaultLayer
+    index = SpacingGroupsIndex(font.groups)
+    if groupNames is None:
+        groupNames = sorted(index.groups)
+
+    paths = {}
+    groups = []
+    for groupName in groupNames:
+        glyphNames = [glyphName for glyphName in index.groups.get(groupName, []) if glyphName in layer]
+        keyName = getKeyGlyph(groupName, glyphNames)
+        if keyName is None:
+            continue
+        for glyphName in glyphNames:
+            if glyphName not in paths:
+                glyph = layer[glyphName]
+                paths[glyphName] = getGlyphPath(glyph), glyph.width
+        groups.append((groupName, getGroupSide(groupName), keyName, glyphNames))
+
+    unitsPerEm = font.info.unitsPerEm or 1000
+    descender = font.info.descender if font.info.descender is not None else -unitsPerEm * 0.25
+    metrics = { 'unitsPerEm' : unitsPerEm, 'descender' : descender }
+
+    return groups, paths, metrics
+
+def _getGroupLayout(group, paths, metrics, opacity):
+    '''Get the view box of a group proof, and the offset and alpha of each glyph.'''
+    groupName, side, keyName, glyphNames = group
+    keyWidth = paths[keyName][1]
+    alpha = (1.0 / len(glyphNames) + opacity) / 2
+
+    items = []
+    xMin, xMax = 0, keyWidth
+    for glyphName in glyphNames:
+        width = paths[glyphName][1]
+        dx = keyWidth - width if side == 'right' else 0
+        xMin = min(xMin, dx)
+        xMax = max(xMax, dx + width)
+        items.append((glyphName, dx, 0.4 if glyphName == keyName else alpha))
+
+    padding = metrics['unitsPerEm'] * 0.05
+    top = metrics['descender'] + metrics['unitsPerEm']
+    viewBox = xMin - padding, -top, xMax - xMin + padding * 2, metrics['unitsPerEm']
+    indicator = 0 if side == 'left' else keyWidth
+    return viewBox, items, indicator
+
+def _drawGroup(group, metrics, viewBox, items, indicator, glyphElement):
+    x, y, w, h = viewBox
+    elements = []
+    elements.append(f'<rect x="{x}" y="{y}" width="{w}" height="{h}" fill="white"/>')
+    elements.append('<g transform="scale(1,-1)">')
+    for glyphName, dx, alpha in items:
+        elements.append(glyphElement(glyphName, dx, alpha))
+    yMin = metrics['descender']
+    yMax = yMin + metrics['unitsPerEm']
+    elements.append(f'<line x1="{indicator}" y1="{yMin}" x2="{indicator}" y2="{yMax}" stroke="red" stroke-width="10"/>')
+    elements.append('</g>')
+    return elements
+
+def renderGroupSVG(group, paths, metrics, opacity=0.4):
+    '''
+    Render a single spacing group proof as an SVG document.
+
+    Args:
+        group (tuple): A `(groupName, side, keyName, glyphNames)` tuple.
+        paths (dict): `(pathData, width)` tuples by glyph name.
+        metrics (dict): The font’s `unitsPerEm` and `descender`.
+        opacity (float): The opacity of the fill color of glyphs in group.
+
+    '''
+    viewBox, items, indicator = _getGroupLayout(group, paths, metrics, opacity)
+
+    def glyphElement(glyphName, dx, alpha):
+        return f'<path d="{paths[glyphName][0]}" transform="translate({dx},0)" fill-opacity="{alpha:.3f}"/>'
+
+    x, y, w, h = viewBox
+    svg = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{x} {y} {w} {h}" width="{w:.0f}" height="{h:.0f}">']
+    svg.append(f'<title>{escape(group[0])}</title>')
+    svg += _drawGroup(group, metrics, viewBox, items, indicator, glyphElement)
+    svg.append('</svg>')
+    return '\n'.join(svg)
+
+def _writeGroupProof(args):
+    group, paths, metrics, opacity, filePath = args
+    svg = renderGroupSVG(group, paths, metrics, opacity)
+    if filePath.endswith('.png'):
+        import cairosvg
+        cairosvg.svg2png(bytestring=svg.encode('utf-8'), write_to=filePath)
+    else:
+        with open(filePath, 'w', encoding='utf-8') as f:
+            f.write(svg)
+    return filePath
+
+def _map(function, items, workers):
+    if workers is None or workers <= 1 or len(items) < 2:
+        return [function(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, items, chunksize=max(1, len(items) // 64)))
+
+def renderGroupProofs(font, folder, layerName=None, groupNames=None, opacity=0.4, fileFormat='svg', workers=None):
+    '''
+    Render one proof file for each spacing group in a font.
+
+    Outlines are collected once in the current process. SVG proofs are rendered in the current process by default, since writing them is faster than starting worker processes. PNG proofs are rasterized in parallel worker processes, one per CPU by default. Set `workers` to choose the number of processes. PNG output requires `cairosvg`.
+
+    File names are derived from group names as in UFO glyph file names, so they are unique also on case-insensitive file systems.
+
+    Returns:
+        A list with the paths of all proof files.
+
+    >>> font = OpenFont('MyFont.ufo', showInterface=False)
+    >>> renderGroupProofs(font, 'proofs')
+
+    '''
+    groups, paths, metrics = collectGroupProofs(font, layerName=layerName, groupNames=groupNames)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    from fontTools.misc.filenames import userNameToFileName
+    if workers is None and fileFormat == 'png':
+        workers = os.cpu_count()
+
+    jobs = []
+    fileNames = set()
+    for group in groups:
+        groupPaths = { glyphName : paths[glyphName] for glyphName in group[3] }
+        fileName = userNameToFileName(group[0], existing=fileNames, suffix='.' + fileFormat)
+        fileNames.add(fileName.lower())
+        jobs.append((group, groupPaths, metrics, opacity, os.path.join(folder, fileName)))
+
+    return _map(_writeGroupProof, jobs, workers)
+
+def _renderSheetCell(args):
+    group, paths, metrics, opacity, pathIds, x, y, cellSize = args
+    viewBox, items, indicator = _getGroupLayout(group, paths, metrics, opacity)
+
+    def glyphElement(glyphName, dx, alpha):
+        return f'<use xlink:href="#{pathIds[glyphName]}" transform="translate({dx},0)" fill-opacity="{alpha:.3f}"/>'
+
+    vx, vy, vw, vh = viewBox
+    cell = [f'<svg x="{x}" y="{y}" width="{cellSize}" height="{cellSize}" viewBox="{vx} {vy} {vw} {vh}">']
+    cell += _drawGroup(group, metrics, viewBox, items, indicator, glyphElement)
+    cell.append('</svg>')
+    cell.append(f'<text x="{x + cellSize / 2}" y="{y + cellSize + 14}" text-anchor="middle" font-family="sans-serif" font-size="10">{escape(group[0])}</text>')
+    return '\n'.join(cell)
+
+def renderContactSheet(font, filePath, layerName=None, groupNames=None, opacity=0.4, columns=10, cellSize=200, workers=None):
+    '''
+    Render proofs of all spacing groups in a font into a single SVG contact sheet.
+
+    Each glyph outline is stored only once in the sheet, and referenced by all groups which contain it. Cells are rendered in the current process, unless a number of worker processes is given.
+
+    >>> font = OpenFont('MyFont.ufo', showInterface=False)
+    >>> renderContactSheet(font, 'contactSheet.svg', columns=12)
+
+    '''
+    groups, paths, metrics = collectGroupProofs(font, layerName=layerName, groupNames=groupNames)
+    pathIds = { glyphName : f'g{i}' for i, glyphName in enumerate(paths) }
+
+    rowHeight = cellSize + 24
+    rows = (len(groups) + columns - 1) // columns
+    width, height = columns * cellSize, max(rows, 1) * rowHeight
+
+    jobs = []
+    for i, group in enumerate(groups):
+        x, y = (i % columns) * cellSize, (i // columns) * rowHeight
+        groupPaths = { glyphName : paths[glyphName] for glyphName in group[3] }
+        jobs.append((group, groupPaths, metrics, opacity, pathIds, x, y, cellSize))
+
+    svg = [f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="{width}" height="{height}" viewBox="0 0 {width} {height}">']
+    svg.append('<defs>')
+    for glyphName, (pathData, glyphWidth) in paths.items():
+        svg.append(f'<path id="{pathIds[glyphName]}" d="{pathData}"/>')
+    svg.append('</defs>')
+    svg += _map(_renderSheetCell, jobs, workers)
+    svg.append('</svg>')
+
+    with open(filePath, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(svg))
+    return filePath
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Render proofs of all spacing groups in a UFO.')
+    parser.add_argument('ufoPath', help='path to the UFO folder')
+    parser.add_argument('folder', nargs='?', default=None, help='folder for one proof file per group')
+    parser.add_argument('--sheet', default=None, help='path of a single SVG contact sheet')
+    parser.add_argument('--layer', default=None, help='name of the layer to proof')
+    parser.add_argument('--format', choices=['svg', 'png'], default='svg', help='format of the proof files')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: one per CPU for PNG, none for SVG)')
+    args = parser.parse_args()
+
+    # read only the glyphs in spacing groups
+    from groupSpacingCore.lazy import LazySpacingFont
+    font = LazySpacingFont(args.ufoPath)
+
+    if args.folder:
+        files = renderGroupProofs(font, args.folder, layerName=args.layer, fileFormat=args.format, workers=args.workers)
+        print(f'{len(files)} proofs saved in {args.folder}')
+    if args.sheet:
+        renderContactSheet(font, args.sheet, layerName=args.layer, workers=args.workers)
+        print(f'contact sheet saved to {args.sheet}')
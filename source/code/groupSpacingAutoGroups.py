@@ -0,0 +1,180 @@
+'''
+Propose spacing groups automatically, by clustering glyphs with matching side profiles.
+
+'''
+
+import random
+from groupSpacingCore.groups import PREFIX_LEFTSIDE, PREFIX_RIGHTSIDE, SpacingGroupsIndex
+from groupSpacingCore.profiles import getGlyphSegments, getSideProfile, getProfileHeights
+from groupSpacingCore.files import writeSpacingGroups
+
+def getSideShapes(glyphs, ys, steps=8):
+    '''
+    Get the shape of the left and right sides of many glyphs.
+
+    A side shape is the side profile relative to the glyph’s extreme point on that side, so glyphs with equal sides but different margins have equal shapes.
+
+    Returns:
+        A dictionary with glyph names as keys and `(leftShape, rightShape)` tuples as values. Glyphs without outlines are skipped.
+
+    '''
+    shapes = {}
+    for glyph in glyphs:
+        if glyph.bounds is None:
+            continue
+        lefts, rights = getSideProfile(getGlyphSegments(glyph, steps=steps), ys)
+        found = [x for x in lefts if x is not None]
+        if not found:
+            continue
+        xMin = min(found)
+        xMax = max(x for x in rights if x is not None)
+        leftShape = tuple(x - xMin if x is not None else None for x in lefts)
+        rightShape = tuple(xMax - x if x is not None else None for x in rights)
+        shapes[glyph.name] = leftShape, rightShape
+    return shapes
+
+def _getBands(size, bands, bandSize, tolerance, seed):
+    '''Pick random subsets of heights, and a random grid offset for each height.'''
+    rnd = random.Random(seed)
+    bandSize = min(bandSize, size)
+    return [[(i, rnd.uniform(0, 4 * tolerance)) for i in sorted(rnd.sample(range(size), bandSize))] for _ in range(bands)]
+
+def _hashBand(shape, band, tolerance):
+    return tuple(int((shape[i] + offset) // (4 * tolerance)) if shape[i] is not None else None for i, offset in band)
+
+def _joinEnvelopes(envelope1, envelope2, tolerance):
+    '''Get the lowest and highest values at each height of two clusters, or None if they would differ by more than the tolerance.'''
+    lows, highs = [], []
+    for low1, high1, low2, high2 in zip(*envelope1, *envelope2):
+        if (low1 is None) != (low2 is None):
+            return
+        if low1 is None:
+            lows.append(None)
+            highs.append(None)
+            continue
+        low, high = min(low1, low2), max(high1, high2)
+        if high - low > tolerance:
+            return
+        lows.append(low)
+        highs.append(high)
+    return lows, highs
+
+def clusterShapes(shapes, tolerance=5, bands=24, bandSize=3, seed=0):
+    '''
+    Cluster glyphs with matching side shapes.
+
+    Shapes are hashed with a banded locality-sensitive hash: each band hashes a few random heights into grid cells four times the tolerance wide, with a random offset. Two shapes within the tolerance share a cell in one band with a probability of at least (3/4) ** bandSize, and are compared if they share any band. Each glyph is only compared with the few glyphs sharing one of its buckets, instead of with all other glyphs.
+
+    Each cluster keeps the lowest and highest value of its shapes at each height. Two clusters are only joined if the result still fits within the tolerance, so any two glyphs in a cluster differ by at most the tolerance at any height – similar shapes do not chain into one large cluster.
+
+    Args:
+        shapes (dict): A dictionary of glyph names and side shapes.
+        tolerance (int or float): The maximum difference between two shapes at any height.
+        bands (int): The number of hash tables.
+        bandSize (int): The number of heights hashed in each table.
+        seed (int): The random seed used to pick heights and offsets, so that results are repeatable.
+
+    Returns:
+        A list of clusters, each one a list of glyph names. Glyphs without any match are not included.
+
+    '''
+    tolerance = max(tolerance, 1e-6)
+    parents = { glyphName : glyphName for glyphName in shapes }
+
+    def find(glyphName):
+        while parents[glyphName] != glyphName:
+            parents[glyphName] = parents[parents[glyphName]]
+            glyphName = parents[glyphName]
+        return glyphName
+
+    # glyphs with identical shapes are joined directly, and only one of them is hashed
+    unique = {}
+    for glyphName, shape in shapes.items():
+        if shape in unique:
+            parents[glyphName] = unique[shape]
+        else:
+            unique[shape] = glyphName
+    if not unique:
+        return []
+
+    envelopes = { glyphName : (shape, shape) for shape, glyphName in unique.items() }
+    size = len(next(iter(unique)))
+    for band in _getBands(size, bands, bandSize, tolerance, seed):
+        buckets = {}
+        for shape, glyphName in unique.items():
+            buckets.setdefault(_hashBand(shape, band, tolerance), []).append(glyphName)
+        for bucket in buckets.values():
+            for i, glyphName in enumerate(bucket):
+                for otherName in bucket[:i]:
+                    root, otherRoot = find(glyphName), find(otherName)
+                    if root == otherRoot:
+                        continue
+                    envelope = _joinEnvelopes(envelopes[root], envelopes[otherRoot], tolerance)
+                    if envelope is None:
+                        continue
+                    parents[root] = otherRoot
+                    envelopes[otherRoot] = envelope
+                    del envelopes[root]
+
+    clusters = {}
+    for glyphName in shapes:
+        clusters.setdefault(find(glyphName), []).append(glyphName)
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
+
+def proposeSpacingGroups(font, layerName=None, ys=None, tolerance=5, steps=8, skipGrouped=True):
+    '''
+    Propose left and right spacing groups for all glyphs in a font.
+
+    Args:
+        font (RFont): A font object.
+        layerName (str or None): The layer in which to measure side profiles. (optional)
+        ys (list or None): The heights at which to measure side profiles. (optional)
+        tolerance (int or float): The maximum difference between two side profiles at any height.
+        steps (int): The number of line segments used to approximate each curve.
+        skipGrouped (bool): Ignore glyphs which are already in a spacing group for that side.
+
+    Returns:
+        A dictionary of proposed spacing groups, named after the first glyph in each group.
+
+    >>> font = CurrentFont()
+    >>> groups = proposeSpacingGroups(font)
+    >>> writeSpacingGroups(groups, 'proposedGroups.json')
+    >>> importSpacingGroups(font, 'proposedGroups.json')
+
+    '''
+    layer = font.getLayer(layerName) if layerName else font.defaultLayer
+    if ys is None:
+        ys = getProfileHeights(font)
+
+    glyphOrder = [glyphName for glyphName in font.glyphOrder if glyphName in layer]
+    ordered = set(glyphOrder)
+    glyphOrder += [glyphName for glyphName in layer.keys() if glyphName not in ordered]
+
+    shapes = getSideShapes([layer[glyphName] for glyphName in glyphOrder], ys, steps=steps)
+    index = SpacingGroupsIndex(font.groups) if skipGrouped else None
+    order = { glyphName : i for i, glyphName in enumerate(glyphOrder) }
+
+    groups = {}
+    for i, (side, prefix) in enumerate([('left', PREFIX_LEFTSIDE), ('right', PREFIX_RIGHTSIDE)]):
+        sideShapes = {}
+        for glyphName, glyphShapes in shapes.items():
+            if index is not None and index.getGroup(glyphName, side) is not None:
+                continue
+            sideShapes[glyphName] = glyphShapes[i]
+        for cluster in clusterShapes(sideShapes, tolerance=tolerance):
+            cluster.sort(key=lambda glyphName: order[glyphName])
+            groups[prefix + cluster[0]] = cluster
+
+    return groups
+
+def exportProposedSpacingGroups(font, filePath, **kwargs):
+    '''
+    Propose spacing groups for a font and save them to a .json file, for review and import with `importSpacingGroups`.
+
+    >>> font = CurrentFont()
+    >>> exportProposedSpacingGroups(font, 'proposedGroups.json', tolerance=3)
+
+    '''
+    groups = proposeSpacingGroups(font, **kwargs)
+    writeSpacingGroups(groups, filePath)
+    return groups
@@ -0,0 +1,77 @@
+'''
+The headless core of GroupSpacing: spacing groups, measurement, copying margins and file I/O.
+
+Works inside and outside RoboFont. Submodules are imported only when one of their names is first used:
+
+>>> from groupSpacingCore import SpacingGroupsIndex, copyMargins
+
+'''
+
+_modules = {
+    'groups'      : 'groupSpacingCore.groups',
+    'measurement' : 'groupSpacingCore.measurement',
+    'profiles'    : 'groupSpacingCore.profiles',
+    'spacing'     : 'groupSpacingCore.spacing',
+    'cache'       : 'groupSpacingCore.cache',
+    'files'       : 'groupSpacingCore.files',
+    'undo'        : 'groupSpacingCore.undo',
+    'tracker'     : 'groupSpacingCore.tracker',
+    'editing'     : 'groupSpacingCore.editing',
+    'layers'      : 'groupSpacingCore.layers',
+    'lazy'        : 'groupSpacingCore.lazy',
+    'metrics'     : 'groupSpacingCore.metrics',
+}
+
+_names = {
+    'PREFIX_LEFTSIDE'       : 'groups',
+    'PREFIX_RIGHTSIDE'      : 'groups',
+    'getGroupsForGlyph'     : 'groups',
+    'SpacingGroupsIndex'    : 'groups',
+    'getKeyGlyph'           : 'groups',
+    'getGroupSide'          : 'groups',
+    'getSiblings'           : 'groups',
+    'getGroupName'          : 'groups',
+    'makeGroup'             : 'groups',
+    'getSpacingGroups'      : 'groups',
+    'MarginsBackend'        : 'measurement',
+    'BoundsBackend'         : 'measurement',
+    'BeamBackend'           : 'measurement',
+    'MultiBeamBackend'      : 'measurement',
+    'OpticalBackend'        : 'measurement',
+    'measurementBackends'   : 'measurement',
+    'getMeasurementBackend' : 'measurement',
+    'getHeadlessBackend'    : 'measurement',
+    'getMargins'            : 'measurement',
+    'copyMargins'           : 'spacing',
+    'copyMarginsBatch'      : 'spacing',
+    'checkSpacingGroup'     : 'spacing',
+    'auditSpacingGroups'    : 'spacing',
+    'MarginsCache'          : 'cache',
+    'writeSpacingGroups'    : 'files',
+    'readSpacingGroups'     : 'files',
+    'exportSpacingGroups'   : 'files',
+    'importSpacingGroups'   : 'files',
+    'shiftMargin'           : 'undo',
+    'SpacingUndo'           : 'undo',
+    'SpacingUndoStack'      : 'undo',
+    'registerUndo'          : 'undo',
+    'SpacingGroupsTracker'  : 'tracker',
+    'GroupsChange'          : 'editing',
+    'SpacingGroupsEditor'   : 'editing',
+    'glyphHasOutlines'      : 'layers',
+    'LayerPresenceIndex'    : 'layers',
+    'LazySpacingFont'       : 'lazy',
+    'LazyLayer'             : 'lazy',
+    'LazyGlyph'             : 'lazy',
+    'MetricsTable'          : 'metrics',
+}
+
+__all__ = list(_names)
+
+def __getattr__(name):
+    from importlib import import_module
+    if name in _names:
+        return getattr(import_module(_modules[_names[name]]), name)
+    if name in _modules:
+        return import_module(_modules[name])
+    raise AttributeError(f"module 'groupSpacingCore' has no attribute '{name}'")
@@ -0,0 +1,63 @@
+'''
+Read and write spacing groups to `.json` files.
+
+'''
+
+import json
+from groupSpacingCore.groups import getSpacingGroups
+
+__all__ = [
+    'writeSpacingGroups',
+    'readSpacingGroups',
+    'exportSpacingGroups',
+    'importSpacingGroups',
+]
+
+def writeSpacingGroups(groups, filePath):
+    '''
+    Write a dictionary of spacing groups to .json file.
+
+    >>> groups = { 'public.kern2.n' : ['n', 'm', 'r'] }
+    >>> writeSpacingGroups(groups, 'spacingGroups.json')
+
+    '''
+    groups = { groupName : list(glyphNames) for groupName, glyphNames in groups.items() }
+    with open(filePath, 'w', encoding='utf-8') as f:
+        json.dump(groups, f, indent=2)
+
+def readSpacingGroups(filePath):
+    '''
+    Read a dictionary of spacing groups from .json file.
+
+    >>> groups = readSpacingGroups('spacingGroups.json')
+
+    '''
+    with open(filePath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def exportSpacingGroups(font, filePath):
+    '''
+    Export spacing groups to .json file.
+
+    >>> font = CurrentFont()
+    >>> filePath = PutFile(message='export spacing groups', fileName='spacingGroups.json')
+    >>> exportSpacingGroups(font, filePath)
+
+    '''
+    msg = 'export spacing groups to .json file'
+    spacingGroups = getSpacingGroups(font)
+    writeSpacingGroups(spacingGroups, filePath)
+
+def importSpacingGroups(font, filePath):
+    '''
+    Import spacing groups from .json file.
+
+    >>> font = CurrentFont()
+    >>> filePath = GetFile(message='import spacing groups', fileTypes=['json'])
+    >>> importSpacingGroups(font, filePath)
+
+    '''
+    msg = 'import spacing groups from .json file'
+    groups = readSpacingGroups(filePath)
+    for group in groups:
+        font.groups[group] = groups[group]
@@ -0,0 +1,151 @@
+'''
+An index of which glyphs have outlines in which layers.
+
+'''
+
+__all__ = [
+    'glyphHasOutlines',
+    'LayerPresenceIndex',
+]
+
+def glyphHasOutlines(glyph):
+    '''Check if a glyph has any contours or components.'''
+    return bool(len(glyph.contours) or len(glyph.components))
+
+class LayerPresenceIndex:
+
+    '''
+    A per-font index of the glyphs which have outlines (contours or components) in each layer.
+
+    Multi-layer operations can iterate over real `(layerName, glyphName)` pairs only, without loading glyphs which are missing or empty in sparse layers such as backgrounds or sketches.
+
+    Inside RoboFont, each layer is read from defcon’s `glyphsWithOutlines` and `componentReferences`, and with `LazySpacingFont` from the raw `.glif` data, so glyphs are not loaded from disk. The index can be kept up-to-date with observers.
+
+    >>> font = CurrentFont()
+    >>> presence = LayerPresenceIndex(font)
+    >>> for layerName, glyphName in presence.iterPairs(['n', 'm', 'h']):
+    >>>     print(layerName, glyphName)
+
+    '''
+
+    def __init__(self, font):
+        self.font = font
+        self._observing = False
+        self.reload()
+
+    def reload(self):
+        '''Read all layers again.'''
+        self._layers = { layerName : self._readLayer(layerName) for layerName in self.font.layerOrder }
+
+    def _readLayer(self, layerName):
+        layer = self.font.getLayer(layerName)
+        naked = layer.naked() if hasattr(layer, 'naked') else None
+        if naked is not None and hasattr(naked, 'glyphsWithOutlines'):
+            # defcon only counts contours, so composites are added from the component references
+            glyphNames = set(naked.glyphsWithOutlines)
+            for composites in naked.componentReferences.values():
+                glyphNames.update(composites)
+            return glyphNames
+        if hasattr(layer, 'getGlyphNamesWithOutlines'):
+            # lazy layers check the .glif files without loading the glyphs
+            return layer.getGlyphNamesWithOutlines()
+        return { glyphName for glyphName in layer.keys() if glyphHasOutlines(layer[glyphName]) }
+
+    # -------
+    # queries
+    # -------
+
+    def hasOutlines(self, layerName, glyphName):
+        '''Check if a glyph has outlines in a layer.'''
+        return glyphName in self._layers.get(layerName, ())
+
+    def getGlyphNames(self, layerName):
+        '''Get the names of all glyphs with outlines in a layer.'''
+        return set(self._layers.get(layerName, ()))
+
+    def getLayersForGlyph(self, glyphName):
+        '''Get the names of all layers in which a glyph has outlines, in layer order.'''
+        return [layerName for layerName in self.font.layerOrder if glyphName in self._layers.get(layerName, ())]
+
+    def iterPairs(self, glyphNames, layerNames=None):
+        '''
+        Iterate over `(layerName, glyphName)` pairs for glyphs with outlines only.
+
+        Args:
+            glyphNames (list): The names of the glyphs.
+            layerNames (list or None): The names of the layers. Defaults to all layers.
+
+        '''
+        if layerNames is None:
+            layerNames = self.font.layerOrder
+        for layerName in layerNames:
+            present = self._layers.get(layerName)
+            if not present:
+                continue
+            for glyphName in glyphNames:
+                if glyphName in present:
+                    yield layerName, glyphName
+
+    # -------
+    # changes
+    # -------
+
+    def glyphChanged(self, glyphName, layerName):
+        '''Update the index after a glyph was changed, added or removed.'''
+        if layerName not in self._layers:
+            self._layers[layerName] = set()
+        layer = self.font.getLayer(layerName)
+        if glyphName in layer and glyphHasOutlines(layer[glyphName]):
+            self._layers[layerName].add(glyphName)
+        else:
+            self._layers[layerName].discard(glyphName)
+
+    def glyphRemoved(self, glyphName, layerName):
+        '''Update the index after a glyph was removed from a layer.'''
+        self._layers.get(layerName, set()).discard(glyphName)
+
+    # ---------
+    # observers
+    # ---------
+
+    _notifications = [
+        ('_glyphChangedNotification', 'Glyph.ContoursChanged'),
+        ('_glyphChangedNotification', 'Glyph.ComponentsChanged'),
+        ('_glyphAddedNotification',   'Layer.GlyphAdded'),
+        ('_glyphDeletedNotification', 'Layer.GlyphDeleted'),
+        ('_layersChangedNotification', 'LayerSet.LayerAdded'),
+        ('_layersChangedNotification', 'LayerSet.LayerDeleted'),
+        ('_layersChangedNotification', 'LayerSet.LayerNameChanged'),
+    ]
+
+    def startObserving(self):
+        '''Update the index automatically when glyphs or layers are changed.'''
+        if self._observing:
+            return
+        dispatcher = self.font.naked().dispatcher
+        for methodName, notification in self._notifications:
+            dispatcher.addObserver(self, methodName, notification)
+        self._observing = True
+
+    def stopObserving(self):
+        '''Stop updating the index automatically.'''
+        if not self._observing:
+            return
+        dispatcher = self.font.naked().dispatcher
+        for methodName, notification in self._notifications:
+            dispatcher.removeObserver(self, notification)
+        self._observing = False
+
+    def _glyphChangedNotification(self, notification):
+        glyph = notification.object
+        if glyph.layer is not None:
+            self.glyphChanged(glyph.name, glyph.layer.name)
+
+    def _glyphAddedNotification(self, notification):
+        self.glyphChanged(notification.data['name'], notification.object.name)
+
+    def _glyphDeletedNotification(self, notification):
+        self.glyphRemoved(notification.data['name'], notification.object.name)
+
+    def _layersChangedNotification(self, notification):
+        self.reload()
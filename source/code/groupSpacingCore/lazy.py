@@ -0,0 +1,341 @@
+'''
+Open a UFO for spacing without loading the whole font: glyphs are read from disk only when they are used.
+
+'''
+
+from groupSpacingCore.groups import getSpacingGroups
+
+__all__ = [
+    'LazySpacingFont',
+    'LazyLayer',
+    'LazyGlyph',
+]
+
+class _Info:
+
+    '''Font info attributes read from `fontinfo.plist`. Missing attributes are None.'''
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return None
+
+class LazyGlyph:
+
+    '''
+    A minimal glyph object, with the attributes and methods used by the spacing functions.
+
+    Contours and components are stored as a recording of point pen calls.
+
+    '''
+
+    def __init__(self, layer, name):
+        self.layer = layer
+        self.name = name
+        self.width = 0
+        self.height = 0
+        self.unicodes = []
+        self.anchors = []
+        self.guidelines = []
+        self.lib = {}
+        self.note = None
+        self.image = None
+        self._outline = []
+
+    def __repr__(self):
+        return f'<LazyGlyph {self.name} ({self.layer.name})>'
+
+    @property
+    def font(self):
+        return self.layer.font
+
+    @property
+    def contours(self):
+        '''The point records of each contour.'''
+        contours = []
+        for method, args, kwargs in self._outline:
+            if method == 'beginPath':
+                contours.append([])
+            elif method == 'addPoint':
+                contours[-1].append(args)
+        return contours
+
+    @property
+    def components(self):
+        '''The `(baseGlyph, transformation)` of each component.'''
+        return [args for method, args, kwargs in self._outline if method == 'addComponent']
+
+    def getLayer(self, layerName):
+        '''Get this glyph in another layer. Returns an empty glyph if it does not exist there.'''
+        layer = self.font.getLayer(layerName)
+        if self.name in layer:
+            return layer[self.name]
+        return LazyGlyph(layer, self.name)
+
+    # -------
+    # drawing
+    # -------
+
+    def drawPoints(self, pen):
+        for method, args, kwargs in self._outline:
+            getattr(pen, method)(*args, **kwargs)
+
+    def draw(self, pen):
+        from fontTools.pens.pointPen import PointToSegmentPen
+        self.drawPoints(PointToSegmentPen(pen))
+
+    # -------
+    # metrics
+    # -------
+
+    @property
+    def bounds(self):
+        from fontTools.pens.boundsPen import BoundsPen
+        pen = BoundsPen(self.layer)
+        self.draw(pen)
+        return pen.bounds
+
+    @property
+    def leftMargin(self):
+        bounds = self.bounds
+        if bounds is None:
+            return None
+        return bounds[0]
+
+    @leftMargin.setter
+    def leftMargin(self, value):
+        bounds = self.bounds
+        if bounds is None:
+            return
+        difference = value - bounds[0]
+        self.moveBy((difference, 0))
+        self.width += difference
+
+    @property
+    def rightMargin(self):
+        bounds = self.bounds
+        if bounds is None:
+            return None
+        return self.width - bounds[2]
+
+    @rightMargin.setter
+    def rightMargin(self, value):
+        bounds = self.bounds
+        if bounds is None:
+            return
+        self.width = bounds[2] + value
+
+    def moveBy(self, value):
+        '''Move contours, components, anchors and guidelines.'''
+        dx, dy = value
+        outline = []
+        for method, args, kwargs in self._outline:
+            if method == 'addPoint':
+                (x, y), segmentType, smooth, name = args
+                args = (x + dx, y + dy), segmentType, smooth, name
+            elif method == 'addComponent':
+                baseGlyph, (xx, xy, yx, yy, ox, oy) = args
+                args = baseGlyph, (xx, xy, yx, yy, ox + dx, oy + dy)
+            outline.append((method, args, kwargs))
+        self._outline = outline
+        for item in self.anchors + self.guidelines:
+            if item.get('x') is not None:
+                item['x'] += dx
+            if item.get('y') is not None:
+                item['y'] += dy
+
+    def changed(self):
+        '''Mark the glyph to be written back on save.'''
+        self.layer._changed.add(self.name)
+
+class LazyLayer:
+
+    '''
+    A layer which reads each glyph from its `.glif` file the first time it is accessed.
+
+    '''
+
+    def __init__(self, font, name, glyphSet):
+        self.font = font
+        self.name = name
+        self._glyphSet = glyphSet
+        self._glyphs = {}
+        self._changed = set()
+
+    def __repr__(self):
+        return f'<LazyLayer {self.name} ({len(self._glyphs)} of {len(self._glyphSet)} glyphs loaded)>'
+
+    def __contains__(self, glyphName):
+        return glyphName in self._glyphSet
+
+    def __len__(self):
+        return len(self._glyphSet)
+
+    def __iter__(self):
+        return (self[glyphName] for glyphName in self.keys())
+
+    def keys(self):
+        return self._glyphSet.keys()
+
+    def __getitem__(self, glyphName):
+        glyph = self._glyphs.get(glyphName)
+        if glyph is None:
+            from fontTools.pens.recordingPen import RecordingPointPen
+            glyph = LazyGlyph(self, glyphName)
+            pen = RecordingPointPen()
+            self._glyphSet.readGlyph(glyphName, glyph, pen)
+            glyph._outline = list(pen.value)
+            self._glyphs[glyphName] = glyph
+        return glyph
+
+    def get(self, glyphName, default=None):
+        if glyphName not in self:
+            return default
+        return self[glyphName]
+
+    def getGlyphNamesWithOutlines(self):
+        '''
+        Get the names of all glyphs with contours or components, without loading them.
+
+        Glyphs which were already loaded are checked in memory. All others are checked in the raw `.glif` data, without parsing it.
+
+        '''
+        glyphNames = set()
+        for glyphName in self.keys():
+            glyph = self._glyphs.get(glyphName)
+            if glyph is not None:
+                if glyph.contours or glyph.components:
+                    glyphNames.add(glyphName)
+                continue
+            data = self._glyphSet.getGLIF(glyphName)
+            if b'<contour' in data or b'<component' in data:
+                glyphNames.add(glyphName)
+        return glyphNames
+
+    @property
+    def loadedGlyphNames(self):
+        '''The names of all glyphs which were read from disk.'''
+        return list(self._glyphs)
+
+    @property
+    def changedGlyphNames(self):
+        '''The names of all glyphs which were changed since the font was opened or saved.'''
+        return sorted(self._changed)
+
+class LazySpacingFont:
+
+    '''
+    A UFO opened for spacing only.
+
+    Only `groups.plist`, `fontinfo.plist` and the glyph set contents are read when the font is opened. Glyphs are read from their `.glif` files when they are first accessed – in practice, the members of the spacing groups being used and the base glyphs of their components. Memory and loading time scale with the number of glyphs used, not with the size of the font.
+
+    Saving writes only the changed glyphs (and the groups, if they were changed) back to the UFO.
+
+    >>> font = LazySpacingFont('MyFont.ufo')
+    >>> print(auditSpacingGroups(font))
+    >>> glyph = font['n']
+    >>> copyMargins(glyph, getSiblings(glyph, 'left'), 'left', allLayers=True)
+    >>> font.save()
+
+    '''
+
+    def __init__(self, path):
+        from fontTools.ufoLib import UFOReader
+        self.path = path
+        self._reader = UFOReader(path, validate=False)
+        self.groups = self._reader.readGroups(validate=False)
+        self._savedGroups = { groupName : list(glyphNames) for groupName, glyphNames in self.groups.items() }
+        self.info = _Info()
+        self._reader.readInfo(self.info, validate=False)
+        self.layerOrder = self._reader.getLayerNames()
+        self._defaultLayerName = self._reader.getDefaultLayerName()
+        self._layers = {}
+        self._lib = None
+
+    def __repr__(self):
+        return f'<LazySpacingFont {self.path}>'
+
+    @property
+    def lib(self):
+        if self._lib is None:
+            self._lib = self._reader.readLib(validate=False)
+        return self._lib
+
+    # ------
+    # layers
+    # ------
+
+    def getLayer(self, layerName):
+        layer = self._layers.get(layerName)
+        if layer is None:
+            if layerName not in self.layerOrder:
+                raise ValueError(f"No layer with the name '{layerName}' exists.")
+            glyphSet = self._reader.getGlyphSet(layerName, validateRead=False)
+            layer = self._layers[layerName] = LazyLayer(self, layerName, glyphSet)
+        return layer
+
+    @property
+    def defaultLayer(self):
+        return self.getLayer(self._defaultLayerName)
+
+    def __contains__(self, glyphName):
+        return glyphName in self.defaultLayer
+
+    def __getitem__(self, glyphName):
+        return self.defaultLayer[glyphName]
+
+    def keys(self):
+        return self.defaultLayer.keys()
+
+    def getSpacingGroupMembers(self):
+        '''Get the names of all glyphs in spacing groups.'''
+        return { glyphName for glyphNames in getSpacingGroups(self).values() for glyphName in glyphNames }
+
+    def loadSpacingGroupMembers(self, layerNames=None):
+        '''
+        Read all members of spacing groups in the given layers, ahead of use.
+
+        Args:
+            layerNames (list or None): The names of the layers. Defaults to all layers.
+
+        '''
+        glyphNames = self.getSpacingGroupMembers()
+        for layerName in (layerNames if layerNames is not None else self.layerOrder):
+            layer = self.getLayer(layerName)
+            for glyphName in glyphNames:
+                if glyphName in layer:
+                    layer[glyphName]
+
+    # ------
+    # saving
+    # ------
+
+    def save(self):
+        '''
+        Write changed glyphs and groups back to the UFO.
+
+        Returns:
+            The number of glyphs written.
+
+        '''
+        from fontTools.ufoLib import UFOWriter
+        writer = UFOWriter(self.path, formatVersion=self._reader.formatVersionTuple, validate=False)
+        count = 0
+        for layerName, layer in self._layers.items():
+            if not layer._changed:
+                continue
+            glyphSet = writer.getGlyphSet(layerName, defaultLayer=layerName == self._defaultLayerName, validateWrite=False)
+            for glyphName in sorted(layer._changed):
+                glyph = layer[glyphName]
+                glyphSet.writeGlyph(glyphName, glyph, drawPointsFunc=glyph.drawPoints, validate=False)
+                count += 1
+            glyphSet.writeContents()
+            layer._changed = set()
+        if self.groups != self._savedGroups:
+            writer.writeGroups(self.groups, validate=False)
+            self._savedGroups = { groupName : list(glyphNames) for groupName, glyphNames in self.groups.items() }
+        writer.close()
+        return count
+
+    def close(self):
+        self._reader.close()
@@ -0,0 +1,256 @@
+'''
+Backends to measure glyph margins.
+
+All backends share the same interface: `measure` takes a list of glyphs and returns a list of `(leftMargin, rightMargin)` tuples, or None for glyphs which cannot be measured. Measuring many glyphs in one call allows backends to prepare data once for the whole batch.
+
+>>> backend = getMeasurementBackend('beam', beam=350)
+>>> print(backend.measure([font['n'], font['m']]))
+
+'''
+
+import importlib.util
+
+__all__ = [
+    'MarginsBackend',
+    'BoundsBackend',
+    'BeamBackend',
+    'MultiBeamBackend',
+    'OpticalBackend',
+    'measurementBackends',
+    'getMeasurementBackend',
+    'getHeadlessBackend',
+    'getMargins',
+]
+
+class MarginsBackend:
+
+    '''Base class for margin measurement backends.'''
+
+    name = None
+
+    def measure(self, glyphs):
+        '''Measure the left and right margins of a list of glyphs.'''
+        return [self.measureGlyph(glyph) for glyph in glyphs]
+
+    def measureGlyph(self, glyph):
+        '''Measure the left and right margins of a single glyph.'''
+        raise NotImplementedError
+
+    def getSettings(self):
+        '''Get the backend name and parameters as a dictionary, which can be passed back to `getMeasurementBackend`.'''
+        return { 'name' : self.name }
+
+    def getFontSettings(self, font):
+        '''Get the settings with all defaults which depend on the font resolved, for example to key cached margins.'''
+        return self.getSettings()
+
+class BoundsBackend(MarginsBackend):
+
+    '''Measure margins from the bounding box of the glyph.'''
+
+    name = 'bounds'
+
+    def measureGlyph(self, glyph):
+        bounds = glyph.bounds
+        if bounds is None:
+            return
+        xMin, yMin, xMax, yMax = bounds
+        return xMin, glyph.width - xMax
+
+class BeamBackend(MarginsBackend):
+
+    '''Measure margins at a single height, using RoboFont’s `IntersectGlyphWithLine`.'''
+
+    name = 'beam'
+
+    def __init__(self, beam):
+        self.beam = beam
+
+    def measure(self, glyphs):
+        from mojo.tools import IntersectGlyphWithLine
+        return [self._measureGlyph(glyph, IntersectGlyphWithLine) for glyph in glyphs]
+
+    def measureGlyph(self, glyph):
+        return self.measure([glyph])[0]
+
+    def _measureGlyph(self, glyph, IntersectGlyphWithLine):
+        line = (-1000, self.beam), (glyph.width + 1000, self.beam)
+        intersections = IntersectGlyphWithLine(glyph, line, canHaveComponent=True, addSideBearings=True)
+        intersections.sort()
+
+        if not len(intersections) > 2:
+            return
+
+        leftMargin = intersections[1][0] - intersections[0][0]
+        rightMargin = intersections[-1][0] - intersections[-2][0]
+
+        return leftMargin, rightMargin
+
+    def getSettings(self):
+        return { 'name' : self.name, 'beam' : self.beam }
+
+class MultiBeamBackend(MarginsBackend):
+
+    '''
+    Measure margins at several heights, and return the average of all heights which intersect the glyph.
+
+    Outlines are flattened once per glyph and intersected with all beams at the same time. Works outside RoboFont, so a single beam can also be measured headlessly with `MultiBeamBackend([beam])`.
+
+    '''
+
+    name = 'beams'
+
+    def __init__(self, beams, steps=8):
+        self.beams = list(beams)
+        self.steps = steps
+
+    def measure(self, glyphs):
+        from groupSpacingCore.profiles import getGlyphSegments, getSideProfile
+        return [self._measureGlyph(getSideProfile(getGlyphSegments(glyph, steps=self.steps), self.beams), glyph.width) for glyph in glyphs]
+
+    def measureGlyph(self, glyph):
+        return self.measure([glyph])[0]
+
+    def _measureGlyph(self, profile, width):
+        lefts, rights = profile
+        lefts = [x for x in lefts if x is not None]
+        rights = [width - x for x in rights if x is not None]
+        if not lefts:
+            return
+        return sum(lefts) / len(lefts), sum(rights) / len(rights)
+
+    def getSettings(self):
+        return { 'name' : self.name, 'beams' : self.beams, 'steps' : self.steps }
+
+class OpticalBackend(MarginsBackend):
+
+    '''
+    Measure area-based optical margins.
+
+    The white area between each side bearing and the outline, inside a vertical zone, is divided by the height of the zone. The depth of the white area is limited, so open shapes and counters do not dominate the result.
+
+    Args:
+        yMin (int or None): The bottom of the zone. Defaults to the baseline.
+        yMax (int or None): The top of the zone. Defaults to the font’s x-height.
+        depth (int or None): The maximum depth measured from each side of the glyph. Defaults to 1/5 of the em.
+        count (int): The number of heights at which the area is sampled.
+
+    '''
+
+    name = 'optical'
+
+    def __init__(self, yMin=None, yMax=None, depth=None, count=32, steps=8):
+        self.yMin = yMin
+        self.yMax = yMax
+        self.depth = depth
+        self.count = count
+        self.steps = steps
+
+    def _getFontZone(self, font):
+        info = font.info if font is not None else None
+        yMin = self.yMin if self.yMin is not None else 0
+        yMax = self.yMax if self.yMax is not None else (info.xHeight if info and info.xHeight else 500)
+        depth = self.depth if self.depth is not None else (info.unitsPerEm if info and info.unitsPerEm else 1000) / 5
+        return yMin, yMax, depth
+
+    def measure(self, glyphs):
+        from groupSpacingCore.profiles import getGlyphSegments, getSideProfile
+        results = []
+        font = zone = None
+        for glyph in glyphs:
+            # the zone is resolved from the font info once per font, not for every glyph
+            if zone is None or glyph.font != font:
+                font = glyph.font
+                yMin, yMax, depth = zone = self._getFontZone(font)
+                step = (yMax - yMin) / self.count
+                ys = [yMin + step * (i + 0.5) for i in range(self.count)]
+            lefts, rights = getSideProfile(getGlyphSegments(glyph, steps=self.steps), ys)
+            results.append(self._measureGlyph(glyph, lefts, rights, depth))
+        return results
+
+    def measureGlyph(self, glyph):
+        return self.measure([glyph])[0]
+
+    def _measureGlyph(self, glyph, lefts, rights, depth):
+
+        found = [x for x in lefts if x is not None]
+        if not found:
+            return
+        xMin = min(found)
+        xMax = max(x for x in rights if x is not None)
+
+        leftArea = sum(min(x - xMin, depth) if x is not None else depth for x in lefts)
+        rightArea = sum(min(xMax - x, depth) if x is not None else depth for x in rights)
+
+        return xMin + leftArea / self.count, glyph.width - xMax + rightArea / self.count
+
+    def getSettings(self):
+        return { 'name' : self.name, 'yMin' : self.yMin, 'yMax' : self.yMax, 'depth' : self.depth, 'count' : self.count, 'steps' : self.steps }
+
+    def getFontSettings(self, font):
+        yMin, yMax, depth = self._getFontZone(font)
+        return dict(self.getSettings(), yMin=yMin, yMax=yMax, depth=depth)
+
+measurementBackends = {
+    BoundsBackend.name    : BoundsBackend,
+    BeamBackend.name      : BeamBackend,
+    MultiBeamBackend.name : MultiBeamBackend,
+    OpticalBackend.name   : OpticalBackend,
+}
+
+def getMeasurementBackend(name, **settings):
+    '''
+    Get a margin measurement backend by name.
+
+    >>> backend = getMeasurementBackend('optical', yMax=500)
+
+    '''
+    return measurementBackends[name](**settings)
+
+def getHeadlessBackend(settings=None, beam=None):
+    '''
+    Get a measurement backend from saved settings (or a beam), which also works outside RoboFont.
+
+    Outside RoboFont, single beams are measured with `MultiBeamBackend([beam])` instead of `IntersectGlyphWithLine`.
+
+    Returns:
+        A backend, or None to measure the bounds.
+
+    >>> backend = getHeadlessBackend({ 'name' : 'beam', 'beam' : 350 })
+
+    '''
+    if settings is None:
+        if beam is None:
+            return
+        settings = { 'name' : 'beam', 'beam' : beam }
+    settings = dict(settings)
+    if settings['name'] == 'beam' and importlib.util.find_spec('mojo') is None:
+        return MultiBeamBackend([settings['beam']])
+    return getMeasurementBackend(**settings)
+
+def getMargins(glyph, beam=None, backend=None):
+    '''
+    Get left and right margins for a glyph.
+
+    Args:
+        glyph (RGlyph): A glyph object.
+        beam (int or None): A beam to measure the margins. (optional)
+        backend (MarginsBackend or None): A backend to measure the margins. Overrides `beam`. (optional)
+
+    Returns:
+        A tuple with left and right margins, or None if the beam does not intersect any contours.
+
+    >>> glyph = CurrentGlyph()
+    >>> sp = CurrentSpaceCenter()
+    >>> beam = sp.beam()
+    >>> print(glyph.name, beam, getMargins(glyph, beam))
+
+    '''
+    if backend is not None:
+        return backend.measure([glyph])[0]
+
+    if beam is None:
+        return glyph.leftMargin, glyph.rightMargin
+
+    else:
+        return BeamBackend(beam).measureGlyph(glyph)
@@ -0,0 +1,160 @@
+import json
+from groupSpacingCore.groups import SpacingGroupsIndex, makeGroup
+from groupSpacingCore.measurement import getHeadlessBackend
+from groupSpacingCore.spacing import copyMargins
+from groupSpacingCore.editing import SpacingGroupsEditor
+
+JOURNAL_VERSION = 1
+
+class SpacingJournal:
+
+    '''
+    A compact record of group spacing operations.
+
+    A journal recorded while spacing one master can be saved to a `.json` file and replayed in other fonts.
+
+    Each entry is a dictionary with an `action` key:
+
+    - `makeGroup`: `glyph`, `side`
+    - `editGroups`: `operations` (the group edits, as `[methodName, *args]` lists of `SpacingGroupsEditor` calls)
+    - `copyMargins`: `glyph`, `layer`, `side`, `beam`, `layers`, `allLayers`, `deltas`, and optionally `measurement` (the settings of the measurement backend)
+
+    Deltas are stored as `[glyphName, layerName, difference]` lists and are kept for reference only: when replaying, margins are measured again in each target font.
+
+    >>> journal = SpacingJournal()
+    >>> glyph = CurrentGlyph()
+    >>> siblings = getSiblings(glyph, 'left')
+    >>> deltas = copyMargins(glyph, siblings, 'left')
+    >>> journal.recordCopyMargins(glyph.name, glyph.layer.name, 'left', None, [glyph.layer.name], False, deltas)
+    >>> journal.save('spacing.json')
+
+    '''
+
+    def __init__(self, entries=None):
+        self.entries = list(entries) if entries else []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def clear(self):
+        '''Remove all entries from the journal.'''
+        self.entries = []
+
+    def recordMakeGroup(self, glyphName, side):
+        '''Record the creation of a new spacing group.'''
+        self.entries.append({
+            'action' : 'makeGroup',
+            'glyph'  : glyphName,
+            'side'   : side,
+        })
+
+    def recordEditGroups(self, change):
+        '''Record a batch of group edits, as returned by `SpacingGroupsEditor.commit`.'''
+        if not change:
+            return
+        self.entries.append({
+            'action'     : 'editGroups',
+            'operations' : [list(operation) for operation in change.operations],
+        })
+
+    def recordCopyMargins(self, glyphName, layerName, side, beam, layerNames, allLayers, deltas, backend=None):
+        '''Record a margin transfer from a glyph in a given layer to its siblings.'''
+        entry = {
+            'action'    : 'copyMargins',
+            'glyph'     : glyphName,
+            'layer'     : layerName,
+            'side'      : side,
+            'beam'      : beam,
+            'layers'    : list(layerNames),
+            'allLayers' : bool(allLayers),
+            'deltas'    : [list(delta) for delta in deltas],
+        }
+        if backend is not None:
+            entry['measurement'] = backend.getSettings()
+        self.entries.append(entry)
+
+    def save(self, filePath):
+        '''Save the journal to a .json file.'''
+        data = { 'version' : JOURNAL_VERSION, 'entries' : self.entries }
+        with open(filePath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def load(cls, filePath):
+        '''Load a journal from a .json file.'''
+        with open(filePath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('entries', []))
+
+def replayJournal(journal, fonts, verbose=False):
+    '''
+    Apply all operations in a journal to other fonts, without any user interface.
+
+    A single spacing groups index is built for each target font and kept up-to-date while replaying.
+
+    Outside RoboFont, margins recorded with a beam are measured with `MultiBeamBackend([beam])`.
+
+    Args:
+        journal (SpacingJournal): The journal to replay.
+        fonts (list): A list of font objects.
+        verbose (bool): Print information when copying margins.
+
+    Returns:
+        A list with the resulting deltas for each font, as `(glyphName, layerName, difference)` tuples.
+
+    >>> journal = SpacingJournal.load('spacing.json')
+    >>> replayJournal(journal, AllFonts())
+
+    '''
+    results = []
+
+    for font in fonts:
+        index = SpacingGroupsIndex(font.groups)
+        fontDeltas = []
+
+        for entry in journal:
+            if entry['action'] == 'editGroups':
+                # only the glyphs named in each edit are touched in the target font
+                editor = SpacingGroupsEditor(font, index=index)
+                editor.replay(entry['operations'])
+                editor.commit()
+                continue
+
+            glyphName = entry['glyph']
+            side = entry['side']
+
+            if glyphName not in font:
+                continue
+
+            if entry['action'] == 'makeGroup':
+                groupName = makeGroup(font, glyphName, side)
+                if groupName is not None:
+                    index.setGroup(groupName, [glyphName])
+
+            elif entry['action'] == 'copyMargins':
+                if entry['allLayers']:
+                    layerNames = font.layerOrder
+                else:
+                    layerNames = [layerName for layerName in entry['layers'] if layerName in font.layerOrder]
+                if not layerNames:
+                    continue
+
+                sourceLayer = entry['layer'] if entry['layer'] in font.layerOrder else layerNames[0]
+                glyph = font[glyphName].getLayer(sourceLayer)
+                if glyph.bounds is None:
+                    continue
+
+                siblings = index.getSiblings(glyphName, side)
+                if not siblings:
+                    continue
+
+                backend = getHeadlessBackend(entry.get('measurement'), beam=entry['beam'])
+                deltas = copyMargins(glyph, siblings, side, verbose=verbose, layerNames=layerNames, backend=backend)
+                fontDeltas += deltas
+
+        results.append(fontDeltas)
+
+    return results
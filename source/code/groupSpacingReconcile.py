@@ -0,0 +1,134 @@
+'''
+Merge spacing groups from many fonts into one unified set, and report conflicts.
+
+    python groupSpacingReconcile.py Regular.ufo Bold.ufo other.json -o unified.json --report conflicts.json
+
+'''
+
+import os
+import json
+import plistlib
+from groupSpacingCore.groups import getGroupSide, getSpacingGroups
+from groupSpacingCore.files import readSpacingGroups, writeSpacingGroups
+
+def readSourceGroups(source):
+    '''
+    Get spacing groups from a font object, a `.json` export, a UFO folder or a dictionary.
+
+    UFO folders are read directly from `groups.plist`, without opening the font.
+
+    '''
+    if isinstance(source, dict):
+        groups = source
+    elif isinstance(source, str):
+        if os.path.isdir(source):
+            groupsPath = os.path.join(source, 'groups.plist')
+            groups = {}
+            if os.path.exists(groupsPath):
+                with open(groupsPath, 'rb') as f:
+                    groups = plistlib.load(f)
+        else:
+            groups = readSpacingGroups(source)
+    else:
+        return getSpacingGroups(source)
+    return { groupName : list(glyphNames) for groupName, glyphNames in groups.items() if getGroupSide(groupName) is not None }
+
+def _getSourceName(source, i):
+    if isinstance(source, str):
+        return os.path.basename(source.rstrip(os.sep))
+    path = getattr(source, 'path', None)
+    if path:
+        return os.path.basename(path)
+    return f'source {i}'
+
+def reconcileSpacingGroups(sources, sourceNames=None):
+    '''
+    Merge spacing groups from many sources into one unified set.
+
+    All sources are read into a single index of `(side, glyphName) → groupName → sources`, in one pass over all group members. Unions, intersections and conflicts are then computed from the index with set operations.
+
+    A glyph which is in different groups on the same side in different sources is a conflict. In the unified set, it is assigned to the group used by most sources (the first one seen, in case of a tie).
+
+    Args:
+        sources (list): Font objects, `.json` exports, UFO folders or dictionaries of groups.
+        sourceNames (list or None): Names for the sources in the report. (optional)
+
+    Returns:
+        A tuple with the unified spacing groups (dict) and a report (dict) with `sources`, `union`, `intersection`, `partial` and `conflicts`.
+
+    >>> groups, report = reconcileSpacingGroups(AllFonts())
+    >>> print(report['conflicts'])
+
+    '''
+    if sourceNames is None:
+        sourceNames = [_getSourceName(source, i) for i, source in enumerate(sources)]
+
+    membership = {}
+    groupSources = {}
+    union = {}
+
+    for i, source in enumerate(sources):
+        for groupName, glyphNames in readSourceGroups(source).items():
+            side = getGroupSide(groupName)
+            groupSources.setdefault(groupName, set()).add(i)
+            members = union.setdefault(groupName, {})
+            for glyphName in glyphNames:
+                members[glyphName] = members.get(glyphName, 0) + 1
+                membership.setdefault((side, glyphName), {}).setdefault(groupName, set()).add(i)
+
+    intersection = {}
+    for groupName, members in union.items():
+        count = len(groupSources[groupName])
+        intersection[groupName] = [glyphName for glyphName, n in members.items() if n == count]
+
+    conflicts = { 'left' : {}, 'right' : {} }
+    partial = {}
+    unified = {}
+
+    for (side, glyphName), groups in membership.items():
+        if len(groups) > 1:
+            conflicts[side][glyphName] = { groupName : sorted(sourceNames[i] for i in ids) for groupName, ids in groups.items() }
+        # dictionaries keep insertion order, so max() returns the first group seen in case of a tie
+        groupName = max(groups, key=lambda name: len(groups[name]))
+        unified.setdefault(groupName, []).append(glyphName)
+        missing = groupSources[groupName] - groups[groupName]
+        if missing and len(groups) == 1:
+            partial.setdefault(groupName, {})[glyphName] = sorted(sourceNames[i] for i in missing)
+
+    # keep the original order of glyphs in each group
+    for groupName, glyphNames in unified.items():
+        glyphNames = set(glyphNames)
+        unified[groupName] = [glyphName for glyphName in union[groupName] if glyphName in glyphNames]
+
+    report = {
+        'sources'      : list(sourceNames),
+        'union'        : { groupName : list(members) for groupName, members in union.items() },
+        'intersection' : intersection,
+        'partial'      : partial,
+        'conflicts'    : conflicts,
+    }
+
+    return unified, report
+
+def writeReconcileReport(report, filePath):
+    '''Write a reconcile report to .json file.'''
+    with open(filePath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Merge spacing groups from many fonts and report conflicts.')
+    parser.add_argument('sources', nargs='+', help='UFO folders or .json exports of spacing groups')
+    parser.add_argument('-o', '--output', required=True, help='path of the unified spacing groups .json file')
+    parser.add_argument('--report', default=None, help='path of the .json report')
+    args = parser.parse_args()
+
+    groups, report = reconcileSpacingGroups(args.sources)
+    writeSpacingGroups(groups, args.output)
+    if args.report:
+        writeReconcileReport(report, args.report)
+
+    conflicts = len(report['conflicts']['left']) + len(report['conflicts']['right'])
+    print(f"{len(groups)} groups from {len(args.sources)} sources, {conflicts} conflicts.")
@@ -0,0 +1,300 @@
+'''
+A local service which keeps fonts and spacing groups in memory, and answers spacing requests from scripts, build steps and editor plugins.
+
+Requests are JSON-RPC 2.0 messages, one per line, over a Unix socket or a localhost TCP port.
+
+    python groupSpacingService.py --socket /tmp/groupSpacing.sock
+    python groupSpacingService.py --port 8765
+
+'''
+
+import os
+import json
+import socket
+import inspect
+import asyncio
+import functools
+from groupSpacingCore.groups import SpacingGroupsIndex, getKeyGlyph, getGroupSide
+from groupSpacingCore.measurement import getMeasurementBackend
+from groupSpacingCore.spacing import copyMargins, auditSpacingGroups
+from groupSpacingCore.lazy import LazySpacingFont
+
+DEFAULT_PORT = 8765
+
+PARSE_ERROR      = -32700
+INVALID_REQUEST  = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS   = -32602
+INTERNAL_ERROR   = -32603
+SPACING_ERROR    = -32000
+
+class GroupSpacingServiceError(Exception):
+
+    '''An error returned by the group spacing service.'''
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+class GroupSpacingService:
+
+    '''
+    A JSON-RPC service which keeps UFOs open, with an index of their spacing groups.
+
+    Fonts are opened with `LazySpacingFont` the first time they are used, and stay in memory until they are closed. Requests for the same font are handled one at a time; requests for different fonts run concurrently.
+
+    Methods:
+
+    - `open(path)` and `close(path, save=False)`
+    - `fonts()`: the paths of all open fonts
+    - `siblings(path, glyph, side)`: the other glyphs in a glyph’s spacing group
+    - `audit(path, layer=None, tolerance=0, measure=None, beam=None)`: groups with glyphs out of sync
+    - `measure(path, glyphs, layer=None, measure=None, beam=None)`: margins of glyphs
+    - `apply(path, group=None, glyph=None, side=None, layers=None, measure=None, beam=None)`: copy the key glyph margin to a group
+    - `save(path)`: write changed glyphs and groups back to the UFO
+
+    >>> service = GroupSpacingService()
+    >>> asyncio.run(service.serve(socketPath='/tmp/groupSpacing.sock'))
+
+    '''
+
+    def __init__(self, verbose=True):
+        self.verbose = verbose
+        self._fonts = {}
+        self._indexes = {}
+        self._locks = {}
+        self._backends = {}
+
+    # -----
+    # state
+    # -----
+
+    def _getFont(self, path):
+        if path not in self._fonts:
+            self._fonts[path] = LazySpacingFont(path)
+            self._indexes[path] = SpacingGroupsIndex(self._fonts[path].groups)
+            if self.verbose:
+                print(f'opened {path}')
+        return self._fonts[path]
+
+    def _getBackend(self, measure=None, beam=None):
+        key = measure, beam
+        if key not in self._backends:
+            if beam is not None:
+                self._backends[key] = getMeasurementBackend('beams', beams=[beam])
+            else:
+                self._backends[key] = getMeasurementBackend(measure or 'bounds')
+        return self._backends[key]
+
+    def _getLayer(self, font, layerName):
+        return font.getLayer(layerName) if layerName else font.defaultLayer
+
+    # -------
+    # methods
+    # -------
+
+    def rpc_open(self, path):
+        font = self._getFont(path)
+        index = self._indexes[path]
+        return { 'path' : path, 'layers' : list(font.layerOrder), 'groups' : len(index.groups) }
+
+    def rpc_close(self, path, save=False):
+        count = self.rpc_save(path) if save and path in self._fonts else 0
+        font = self._fonts.pop(path, None)
+        self._indexes.pop(path, None)
+        if font is not None:
+            font.close()
+        return count
+
+    def rpc_fonts(self):
+        return sorted(self._fonts)
+
+    def rpc_siblings(self, path, glyph, side):
+        self._getFont(path)
+        return self._indexes[path].getSiblings(glyph, side)
+
+    def rpc_audit(self, path, layer=None, tolerance=0, measure=None, beam=None):
+        font = self._getFont(path)
+        backend = self._getBackend(measure, beam)
+        return auditSpacingGroups(font, layerName=layer, backend=backend, index=self._indexes[path], tolerance=tolerance)
+
+    def rpc_measure(self, path, glyphs, layer=None, measure=None, beam=None):
+        font = self._getFont(path)
+        layer = self._getLayer(font, layer)
+        glyphNames = [glyphName for glyphName in glyphs if glyphName in layer]
+        margins = self._getBackend(measure, beam).measure([layer[glyphName] for glyphName in glyphNames])
+        return dict(zip(glyphNames, margins))
+
+    def rpc_apply(self, path, group=None, glyph=None, side=None, layers=None, measure=None, beam=None):
+        font = self._getFont(path)
+        index = self._indexes[path]
+        if group is None:
+            if glyph is None or side is None:
+                raise ValueError('apply needs a group, or a glyph and a side')
+            group = index.getGroup(glyph, side)
+            if group is None:
+                raise KeyError(f"'{glyph}' is not in a {side} spacing group")
+        if group not in index.groups:
+            raise KeyError(f"'{group}' is not a spacing group")
+
+        glyphNames = index.groups[group]
+        keyName = getKeyGlyph(group, glyphNames)
+        layerNames = layers if layers is not None else [font.defaultLayer.name]
+        keyGlyph = self._getLayer(font, layerNames[0])[keyName]
+        return copyMargins(keyGlyph, glyphNames, getGroupSide(group), verbose=False, layerNames=layerNames, backend=self._getBackend(measure, beam))
+
+    def rpc_save(self, path):
+        if path not in self._fonts:
+            raise KeyError(f"'{path}' is not open")
+        count = self._fonts[path].save()
+        if self.verbose:
+            print(f'saved {count} glyphs to {path}')
+        return count
+
+    # --------
+    # dispatch
+    # --------
+
+    async def call(self, method, params):
+        '''Call a service method in a worker thread, holding the lock of its font.'''
+        function = getattr(self, f'rpc_{method}', None)
+        if function is None:
+            raise GroupSpacingServiceError(METHOD_NOT_FOUND, f"method '{method}' not found")
+        if isinstance(params, list):
+            if params and isinstance(params[0], str):
+                params = [os.path.abspath(params[0])] + params[1:]
+            args, kwargs = params, {}
+        elif isinstance(params, dict):
+            if isinstance(params.get('path'), str):
+                params = dict(params, path=os.path.abspath(params['path']))
+            args, kwargs = [], params
+        else:
+            raise GroupSpacingServiceError(INVALID_PARAMS, 'params must be a list or an object')
+
+        try:
+            path = inspect.signature(function).bind(*args, **kwargs).arguments.get('path')
+        except TypeError as e:
+            raise GroupSpacingServiceError(INVALID_PARAMS, str(e))
+
+        lock = self._locks.setdefault(path, asyncio.Lock())
+        loop = asyncio.get_running_loop()
+        async with lock:
+            try:
+                return await loop.run_in_executor(None, functools.partial(function, *args, **kwargs))
+            except (KeyError, ValueError, OSError) as e:
+                raise GroupSpacingServiceError(SPACING_ERROR, e.args[0] if e.args else str(e))
+
+    async def handleMessage(self, line):
+        '''Handle a single JSON-RPC message. Returns the response, or None for notifications.'''
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return { 'jsonrpc' : '2.0', 'id' : None, 'error' : { 'code' : PARSE_ERROR, 'message' : 'parse error' } }
+
+        if not isinstance(message, dict) or not isinstance(message.get('method'), str):
+            return { 'jsonrpc' : '2.0', 'id' : None, 'error' : { 'code' : INVALID_REQUEST, 'message' : 'invalid request' } }
+
+        messageID = message.get('id')
+        try:
+            response = { 'jsonrpc' : '2.0', 'id' : messageID, 'result' : await self.call(message['method'], message.get('params', {})) }
+        except GroupSpacingServiceError as e:
+            response = { 'jsonrpc' : '2.0', 'id' : messageID, 'error' : { 'code' : e.code, 'message' : str(e) } }
+        except Exception as e:
+            response = { 'jsonrpc' : '2.0', 'id' : messageID, 'error' : { 'code' : INTERNAL_ERROR, 'message' : f'{type(e).__name__}: {e}' } }
+
+        if 'id' not in message:
+            return
+        return response
+
+    async def handleClient(self, reader, writer):
+        '''Answer all requests from one client, in order.'''
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.handleMessage(line)
+                if response is not None:
+                    writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socketPath=None, host='127.0.0.1', port=DEFAULT_PORT):
+        '''Serve requests until cancelled, over a Unix socket if a path is given, or else over TCP.'''
+        if socketPath is not None:
+            if os.path.exists(socketPath):
+                os.remove(socketPath)
+            server = await asyncio.start_unix_server(self.handleClient, path=socketPath, limit=2**24)
+            address = socketPath
+        else:
+            server = await asyncio.start_server(self.handleClient, host=host, port=port, limit=2**24)
+            address = f'{host}:{port}'
+        if self.verbose:
+            print(f'serving group spacing requests on {address}')
+        async with server:
+            await server.serve_forever()
+
+class GroupSpacingClient:
+
+    '''
+    A simple blocking client for the group spacing service.
+
+    >>> client = GroupSpacingClient(socketPath='/tmp/groupSpacing.sock')
+    >>> print(client.call('siblings', path='MyFont.ufo', glyph='n', side='left'))
+    >>> client.call('apply', path='MyFont.ufo', glyph='n', side='left', beam=250)
+    >>> client.call('save', path='MyFont.ufo')
+    >>> client.close()
+
+    '''
+
+    def __init__(self, socketPath=None, host='127.0.0.1', port=DEFAULT_PORT):
+        if socketPath is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(socketPath)
+        else:
+            self._socket = socket.create_connection((host, port))
+        self._file = self._socket.makefile('rwb')
+        self._id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
+
+    def call(self, method, **params):
+        '''Call a service method, and return its result.'''
+        self._id += 1
+        message = { 'jsonrpc' : '2.0', 'id' : self._id, 'method' : method, 'params' : params }
+        self._file.write(json.dumps(message).encode('utf-8') + b'\n')
+        self._file.flush()
+        response = json.loads(self._file.readline())
+        if 'error' in response:
+            raise GroupSpacingServiceError(response['error']['code'], response['error']['message'])
+        return response['result']
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve group spacing requests for UFOs kept in memory.')
+    parser.add_argument('--socket', default=None, help='path of a Unix socket to listen on')
+    parser.add_argument('--host', default='127.0.0.1', help='host to listen on, if no socket is given')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on, if no socket is given')
+    parser.add_argument('--quiet', action='store_true', help='do not print information')
+    args = parser.parse_args()
+
+    service = GroupSpacingService(verbose=not args.quiet)
+    try:
+        asyncio.run(service.serve(socketPath=args.socket, host=args.host, port=args.port))
+    except KeyboardInterrupt:
+        pass
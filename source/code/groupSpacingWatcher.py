@@ -0,0 +1,236 @@
+'''
+Watch a UFO folder and re-apply group spacing whenever glyphs or spacing groups are changed by other tools.
+
+    python groupSpacingWatcher.py MyFont.ufo --beam 350
+    python groupSpacingWatcher.py MyFont.ufo --measure optical
+
+'''
+
+import os
+import time
+import plistlib
+from groupSpacingCore.groups import SpacingGroupsIndex, getKeyGlyph, getGroupSide
+from groupSpacingCore.measurement import getMeasurementBackend
+from groupSpacingCore.spacing import copyMargins
+
+class GroupSpacingWatcher:
+
+    '''
+    A headless watcher which keeps spacing groups in sync in a UFO edited by other tools.
+
+    - polls the UFO’s `groups.plist` and glyph folders for changes
+    - debounces bursts of writes into a single update
+    - reloads only the changed glyphs, not the whole font
+    - re-propagates margins only in the spacing groups affected by the changes
+
+    Adding or removing glyphs or layers reopens the font.
+
+    Beams are measured with `MultiBeamBackend`, which works outside RoboFont.
+
+    >>> watcher = GroupSpacingWatcher('MyFont.ufo', beam=350)
+    >>> watcher.run()
+
+    '''
+
+    def __init__(self, ufoPath, beam=None, layerNames=None, interval=0.5, debounce=1.0, verbose=True, backend=None):
+        self.ufoPath = os.path.abspath(ufoPath)
+        if backend is None:
+            backend = getMeasurementBackend('beams', beams=[beam]) if beam is not None else getMeasurementBackend('bounds')
+        self.backend = backend
+        self.layerNames = layerNames
+        self.interval = interval
+        self.debounce = debounce
+        self.verbose = verbose
+        self._openFont()
+        self._snapshot = self._takeSnapshot()
+
+    # ----------
+    # font state
+    # ----------
+
+    def _openFont(self):
+        from fontParts.world import OpenFont
+        self.font = OpenFont(self.ufoPath, showInterface=False)
+        self.index = SpacingGroupsIndex(self.font.groups)
+        self._readGlyphFiles()
+
+    def _readGlyphFiles(self):
+        '''Map the path of every .glif file to a `(layerName, glyphName)` tuple.'''
+        layerContentsPath = os.path.join(self.ufoPath, 'layercontents.plist')
+        if os.path.exists(layerContentsPath):
+            with open(layerContentsPath, 'rb') as f:
+                layerContents = plistlib.load(f)
+        else:
+            layerContents = [[self.font.layerOrder[0], 'glyphs']]
+
+        self._layerFolders = {}
+        self._glyphFiles = {}
+        for layerName, folderName in layerContents:
+            if self.layerNames is not None and layerName not in self.layerNames:
+                continue
+            folderPath = os.path.join(self.ufoPath, folderName)
+            self._layerFolders[folderPath] = layerName
+            contentsPath = os.path.join(folderPath, 'contents.plist')
+            if not os.path.exists(contentsPath):
+                continue
+            with open(contentsPath, 'rb') as f:
+                contents = plistlib.load(f)
+            for glyphName, fileName in contents.items():
+                self._glyphFiles[os.path.join(folderPath, fileName)] = layerName, glyphName
+
+    def _takeSnapshot(self):
+        '''Get the modification times of all watched files.'''
+        snapshot = {}
+        for fileName in ['groups.plist', 'layercontents.plist']:
+            filePath = os.path.join(self.ufoPath, fileName)
+            if os.path.exists(filePath):
+                snapshot[filePath] = os.stat(filePath).st_mtime_ns
+        for folderPath in self._layerFolders:
+            if not os.path.isdir(folderPath):
+                continue
+            for entry in os.scandir(folderPath):
+                if entry.name.endswith('.glif') or entry.name == 'contents.plist':
+                    snapshot[entry.path] = entry.stat().st_mtime_ns
+        return snapshot
+
+    # -------
+    # polling
+    # -------
+
+    def poll(self):
+        '''
+        Check the UFO for changes since the last poll.
+
+        Returns:
+            A set with the paths of all modified, added and removed files.
+
+        '''
+        snapshot = self._takeSnapshot()
+        changed = { path for path, mtime in snapshot.items() if self._snapshot.get(path) != mtime }
+        changed.update(set(self._snapshot) - set(snapshot))
+        self._snapshot = snapshot
+        return changed
+
+    def run(self):
+        '''Watch the UFO until interrupted, processing each burst of changes once it settles.'''
+        if self.verbose:
+            print(f'watching {self.ufoPath}…\n')
+        pending = set()
+        lastChange = None
+        try:
+            while True:
+                changed = self.poll()
+                if changed:
+                    pending.update(changed)
+                    lastChange = time.monotonic()
+                elif pending and time.monotonic() - lastChange >= self.debounce:
+                    self.update(pending)
+                    pending = set()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+
+    # --------
+    # updating
+    # --------
+
+    def update(self, paths):
+        '''
+        Reload changed data and re-apply group spacing in the affected groups.
+
+        Returns:
+            A list of `(glyphName, layerName, difference)` tuples for all glyphs which were changed.
+
+        '''
+        structural = any(os.path.basename(path) in ['layercontents.plist', 'contents.plist'] for path in paths)
+        layerNames = self.layerNames if self.layerNames is not None else self.font.layerOrder
+
+        affected = set()
+
+        if structural:
+            oldGroups = dict(self.index.groups)
+            self._openFont()
+            affected.update(self._getChangedGroups(oldGroups, layerNames))
+
+        elif os.path.join(self.ufoPath, 'groups.plist') in paths:
+            oldGroups = dict(self.index.groups)
+            self.font.naked().reloadGroups()
+            self.index = SpacingGroupsIndex(self.font.groups)
+            affected.update(self._getChangedGroups(oldGroups, layerNames))
+
+        changedGlyphs = {}
+        for path in paths:
+            if path not in self._glyphFiles or not os.path.exists(path):
+                continue
+            layerName, glyphName = self._glyphFiles[path]
+            changedGlyphs.setdefault(layerName, []).append(glyphName)
+
+        for layerName, glyphNames in changedGlyphs.items():
+            if not structural:
+                self.font.getLayer(layerName).naked().reloadGlyphs(glyphNames)
+            for glyphName in glyphNames:
+                for groupName in self.index.getGroupsForGlyph(glyphName):
+                    if groupName is not None:
+                        affected.add((layerName, groupName))
+
+        deltas = []
+        for layerName, groupName in sorted(affected):
+            deltas += self._propagate(layerName, groupName)
+
+        if deltas:
+            self.font.save()
+
+        # ignore our own writes
+        self._snapshot = self._takeSnapshot()
+
+        if self.verbose:
+            print(f'{len(affected)} groups updated, {len(deltas)} glyphs changed.\n')
+
+        return deltas
+
+    def _getChangedGroups(self, oldGroups, layerNames):
+        changed = set()
+        for groupName in set(oldGroups) | set(self.index.groups):
+            if groupName not in self.index.groups:
+                continue
+            if oldGroups.get(groupName) != self.index.groups[groupName]:
+                for layerName in layerNames:
+                    changed.add((layerName, groupName))
+        return changed
+
+    def _propagate(self, layerName, groupName):
+        '''Copy the margin of a group’s key glyph to all other glyphs in the group, in one layer.'''
+        glyphNames = self.index.groups[groupName]
+        keyName = getKeyGlyph(groupName, glyphNames)
+        if keyName is None:
+            return []
+
+        layer = self.font.getLayer(layerName)
+        if keyName not in layer:
+            return []
+
+        keyGlyph = layer[keyName]
+        if keyGlyph.bounds is None:
+            return []
+
+        siblings = [glyphName for glyphName in glyphNames if glyphName in layer]
+        side = getGroupSide(groupName)
+        return copyMargins(keyGlyph, siblings, side, verbose=self.verbose, layerNames=[layerName], backend=self.backend)
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Re-apply group spacing to changed glyphs in a UFO.')
+    parser.add_argument('ufoPath', help='path to the UFO folder')
+    parser.add_argument('--beam', type=float, default=None, help='measure margins at this height')
+    parser.add_argument('--measure', choices=['bounds', 'optical'], default=None, help='measure margins with this backend instead of a beam')
+    parser.add_argument('--layer', action='append', dest='layerNames', help='watch only this layer (repeatable)')
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between polls')
+    parser.add_argument('--debounce', type=float, default=1.0, help='seconds without changes before updating')
+    parser.add_argument('--quiet', action='store_true', help='do not print information')
+    args = parser.parse_args()
+
+    backend = getMeasurementBackend(args.measure) if args.measure else None
+    watcher = GroupSpacingWatcher(args.ufoPath, beam=args.beam, layerNames=args.layerNames, interval=args.interval, debounce=args.debounce, verbose=not args.quiet, backend=backend)
+    watcher.run()
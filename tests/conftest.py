@@ -0,0 +1,29 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'source', 'code'))
+
+def drawRectangle(glyph, xMin, yMin, xMax, yMax):
+    pen = glyph.getPen()
+    pen.moveTo((xMin, yMin))
+    pen.lineTo((xMax, yMin))
+    pen.lineTo((xMax, yMax))
+    pen.lineTo((xMin, yMax))
+    pen.closePath()
+
+@pytest.fixture
+def font():
+    '''A new font with a few glyphs in spacing groups.'''
+    world = pytest.importorskip('fontParts.world')
+    font = world.NewFont()
+    font.info.unitsPerEm = 1000
+    font.info.descender = -250
+    font.info.xHeight = 500
+    for glyphName, xMin, xMax, width in [('n', 50, 450, 500), ('m', 60, 760, 800), ('h', 40, 450, 500), ('o', 40, 460, 500)]:
+        glyph = font.newGlyph(glyphName)
+        drawRectangle(glyph, xMin, 0, xMax, 500)
+        glyph.width = width
+    font.groups['public.kern2.n'] = ('n', 'm', 'h')
+    font.groups['public.kern1.o'] = ('o', 'n')
+    return font
@@ -0,0 +1,43 @@
+import random
+import pytest
+
+pytest.importorskip('fontTools')
+
+from groupSpacingAutoGroups import clusterShapes
+
+def test_clusterShapesRecall():
+    rnd = random.Random(1)
+    found = 0
+    pairs = 500
+    for i in range(pairs):
+        shape = tuple(rnd.uniform(0, 200) for y in range(16))
+        near = tuple(x + rnd.uniform(-2, 2) for x in shape)
+        clusters = clusterShapes({ 'a' : shape, 'b' : near }, tolerance=5, seed=i)
+        found += clusters == [['a', 'b']]
+    assert found / pairs >= 0.99
+
+def test_clusterShapesPrecision():
+    shapes = {
+        'o' : (10, 2, 0, 0, 2, 10),
+        'c' : (11, 3, 0, 1, 2, 9),
+        'e' : (12, 2, 1, 0, 3, 11),
+        'n' : (0, 0, 0, 0, 0, 0),
+        'v' : (0, 20, 40, 60, 80, 100),
+        'l' : (None, 0, 0, 0, 0, None),
+    }
+    clusters = clusterShapes(shapes, tolerance=5)
+    assert sorted(map(sorted, clusters)) == [['c', 'e', 'o']]
+
+def test_clusterShapesIdentical():
+    shapes = { f'glyph{i}' : (0, 0, 0, 0) for i in range(1000) }
+    shapes['other'] = (50, 50, 50, 50)
+    clusters = clusterShapes(shapes, tolerance=5)
+    assert len(clusters) == 1 and len(clusters[0]) == 1000
+
+def test_clusterShapesDoNotChain():
+    shapes = { f'glyph{i}' : (i * 4, i * 4, 0, 0) for i in range(10) }
+    clusters = clusterShapes(shapes, tolerance=5)
+    assert sum(len(cluster) for cluster in clusters) >= 8
+    for cluster in clusters:
+        values = [shapes[glyphName][0] for glyphName in cluster]
+        assert max(values) - min(values) <= 5
@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip('fontTools')
+
+import groupSpacingBenchmark
+from groupSpacingBenchmark import makeCorpus, runComparisons, _getGlyphs, MarginsEngine
+
+def test_corpusHasNoMismatches():
+    font = makeCorpus(count=20)
+    comparisons = [('margins', 'bounds'), ('margins', 'table'), ('margins', 'cache'), ('beams-python', 'beams'), ('optical-python', 'optical')]
+    results = runComparisons(font, _getGlyphs(font), comparisons=comparisons, repeat=1)
+    for key, result in results.items():
+        assert 'skipped' in result or result['mismatches'] == [], key
+    assert 'skipped' not in results['margins:bounds']
+
+def test_marginsEngineBeamMisses(font, monkeypatch):
+    # the beam returns None for glyphs it does not cross
+    monkeypatch.setattr(groupSpacingBenchmark, 'getMargins', lambda glyph, beam=None: None if glyph.name == 'o' else (1, 2))
+    assert MarginsEngine(250).measure([font['n'], font['o']]) == [(1, 2), None]
@@ -0,0 +1,50 @@
+from groupSpacingCore.groups import SpacingGroupsIndex
+from groupSpacingCore.editing import SpacingGroupsEditor
+
+class GroupsFont:
+
+    '''A font with only groups.'''
+
+    def __init__(self, groups):
+        self.groups = dict(groups)
+
+def test_indexFallback():
+    index = SpacingGroupsIndex({
+        'public.kern1.a' : ['a', 'b'],
+        'public.kern1.b' : ['b', 'c'],
+        'public.kern2.a' : ['a'],
+    })
+    assert index.getGroupsForGlyph('b') == (None, 'public.kern1.a')
+    index.removeGroup('public.kern1.a')
+    assert index.getGroup('b', 'right') == 'public.kern1.b'
+    assert index.getGroup('a', 'right') is None
+    assert index.getGroup('a', 'left') == 'public.kern2.a'
+    index.setGroup('public.kern1.a', ['b'])
+    assert index.getGroup('b', 'right') == 'public.kern1.b'
+    assert index.getSiblings('c', 'right') == ['b', 'c']
+
+def test_editorMovesAndMerges():
+    font = GroupsFont({ 'public.kern2.n' : ['n', 'm', 'h'], 'public.kern2.o' : ['o', 'c'], 'public.kern2.e' : ['e'] })
+    with SpacingGroupsEditor(font) as editor:
+        editor.moveGlyphs(['m'], 'public.kern2.o')
+        editor.mergeGroups(['public.kern2.o', 'public.kern2.e'], 'public.kern2.o')
+    assert font.groups['public.kern2.n'] == ['n', 'h']
+    assert font.groups['public.kern2.o'] == ['o', 'c', 'm', 'e']
+    assert 'public.kern2.e' not in font.groups
+    editor.change.revert()
+    assert font.groups['public.kern2.e'] == ['e']
+
+def test_editorLargeBatch():
+    groups = { f'public.kern2.g{i}' : [f'g{i * 3 + j}' for j in range(3)] for i in range(2000) }
+    font = GroupsFont(groups)
+    with SpacingGroupsEditor(font) as editor:
+        for i in range(200):
+            editor.moveGlyphs([f'g{i * 5 + j}' for j in range(5)], f'public.kern2.g{1999 - i}')
+        editor.mergeGroups([f'public.kern2.g{i}' for i in range(1000, 1500)], 'public.kern2.g1000')
+
+    # only changed groups are written, and the index agrees with the written groups
+    assert len(editor.change.after) < len(groups)
+    assert len(font.groups['public.kern2.g1000']) >= 1500
+    for groupName, glyphNames in font.groups.items():
+        for glyphName in glyphNames:
+            assert editor.index.getGroup(glyphName, 'left') == groupName
@@ -0,0 +1,29 @@
+from groupSpacingCore.measurement import BeamBackend
+from groupSpacingCore.editing import SpacingGroupsEditor
+from groupSpacingJournal import SpacingJournal, replayJournal
+
+def test_replayBeamHeadless(font, tmp_path):
+    journal = SpacingJournal()
+    journal.recordCopyMargins('n', font.defaultLayer.name, 'left', 250, [font.defaultLayer.name], False, [])
+    journal.recordCopyMargins('n', font.defaultLayer.name, 'left', 250, [font.defaultLayer.name], False, [], backend=BeamBackend(250))
+    filePath = str(tmp_path / 'journal.json')
+    journal.save(filePath)
+
+    results = replayJournal(SpacingJournal.load(filePath), [font])
+    assert results == [[('m', font.defaultLayer.name, -10), ('h', font.defaultLayer.name, 10)]]
+    assert font['m'].leftMargin == 50
+
+def test_replayGroupEditsTouchOnlyEditedGlyphs(font):
+    source = font.copy()
+    source.groups['public.kern2.n'] = ('n', 'm', 'h')
+    editor = SpacingGroupsEditor(source, title='make group')
+    editor.addGlyphs('public.kern2.m', ['m'])
+    journal = SpacingJournal()
+    journal.recordEditGroups(editor.commit())
+    assert source.groups['public.kern2.n'] == ('n', 'h')
+
+    # the target has other members in the same group
+    font.groups['public.kern2.n'] = ('n', 'm', 'h', 'r')
+    replayJournal(journal, [font])
+    assert font.groups['public.kern2.n'] == ('n', 'h', 'r')
+    assert font.groups['public.kern2.m'] == ('m',)
@@ -0,0 +1,24 @@
+from groupSpacingCore.layers import LayerPresenceIndex
+from groupSpacingCore.spacing import copyMargins
+
+def test_presenceIncludesComposites(font):
+    nacute = font.newGlyph('nacute')
+    nacute.appendComponent('n', offset=(30, 0))
+    nacute.width = 500
+    background = font.newLayer('background')
+    background.newGlyph('empty')
+
+    presence = LayerPresenceIndex(font)
+    assert presence.hasOutlines(font.defaultLayer.name, 'nacute')
+    assert not presence.hasOutlines('background', 'empty')
+
+def test_copyMarginsToCompositeSibling(font):
+    nacute = font.newGlyph('nacute')
+    nacute.appendComponent('n', offset=(80, 0))
+    nacute.width = 580
+    font.groups['public.kern2.n'] = ('n', 'nacute')
+
+    presence = LayerPresenceIndex(font)
+    deltas = copyMargins(font['n'], ['n', 'nacute'], 'left', verbose=False, presence=presence)
+    assert deltas == [('nacute', font.defaultLayer.name, -80)]
+    assert font['nacute'].leftMargin == 50
@@ -0,0 +1,38 @@
+from conftest import drawRectangle
+from groupSpacingCore.lazy import LazySpacingFont
+from groupSpacingCore.measurement import BoundsBackend
+from groupSpacingCore.layers import LayerPresenceIndex
+
+def test_lazyFontReadsOnlyUsedGlyphs(font, tmp_path):
+    path = str(tmp_path / 'Test.ufo')
+    font.save(path)
+
+    lazyFont = LazySpacingFont(path)
+    layer = lazyFont.defaultLayer
+    assert sorted(layer.keys()) == ['h', 'm', 'n', 'o']
+    assert layer.loadedGlyphNames == []
+    assert BoundsBackend().measure([layer['m']]) == [(60, 40)]
+    assert layer.loadedGlyphNames == ['m']
+
+    layer['m'].leftMargin = 50
+    layer['m'].changed()
+    assert lazyFont.save() == 1
+    lazyFont.close()
+    assert LazySpacingFont(path)['m'].leftMargin == 50
+
+def test_presenceDoesNotLoadGlyphs(font, tmp_path):
+    nacute = font.newGlyph('nacute')
+    nacute.appendComponent('n')
+    font.newGlyph('space')
+    background = font.newLayer('background')
+    drawRectangle(background.newGlyph('o'), 0, 0, 100, 100)
+    background.newGlyph('n')
+    path = str(tmp_path / 'Test.ufo')
+    font.save(path)
+
+    lazyFont = LazySpacingFont(path)
+    presence = LayerPresenceIndex(lazyFont)
+    assert presence.getGlyphNames(lazyFont.defaultLayer.name) == {'n', 'm', 'h', 'o', 'nacute'}
+    assert presence.getGlyphNames('background') == {'o'}
+    assert lazyFont.defaultLayer.loadedGlyphNames == []
+    assert lazyFont.getLayer('background').loadedGlyphNames == []
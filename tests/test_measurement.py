@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip('fontTools')
+
+from groupSpacingCore.measurement import BoundsBackend, MultiBeamBackend, OpticalBackend, getMargins
+from groupSpacingCore.profiles import setUseNumpy
+from groupSpacingCore.cache import MarginsCache
+
+def test_boundsBackend(font):
+    glyphs = [font['n'], font['m'], font.newGlyph('space')]
+    assert BoundsBackend().measure(glyphs) == [(50, 50), (60, 40), None]
+    assert getMargins(font['m']) == (60, 40)
+
+def test_multiBeamBackend(font):
+    backend = MultiBeamBackend([250, 600])
+    assert backend.measure([font['n']]) == [(50, 50)]
+    assert getMargins(font['n'], backend=MultiBeamBackend([600])) is None
+
+@pytest.mark.parametrize('backend', [MultiBeamBackend([100, 250, 400]), OpticalBackend()])
+def test_profilesWithoutNumpy(font, backend):
+    pytest.importorskip('numpy')
+    glyphs = [font[glyphName] for glyphName in 'nmho']
+    expected = backend.measure(glyphs)
+    useNumpy = setUseNumpy(False)
+    try:
+        assert backend.measure(glyphs) == pytest.approx(expected)
+    finally:
+        setUseNumpy(useNumpy)
+
+def test_cache(font):
+    cache = MarginsCache(font, BoundsBackend())
+    glyphs = [font['n'], font['m']]
+    assert cache.measure(glyphs) == [(50, 50), (60, 40)]
+    assert cache.measure(glyphs) == [(50, 50), (60, 40)]
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    font['n'].moveBy((10, 0))
+    assert cache.measure(glyphs) == [(60, 40), (60, 40)]
+    assert cache.misses == 3
+
+    cache.save()
+    assert MarginsCache(font, BoundsBackend()).measure(glyphs) == [(60, 40), (60, 40)]
+
+def test_cacheFollowsFontInfo(font):
+    glyph = font.newGlyph('v')
+    glyph.width = 600
+    pen = glyph.getPen()
+    pen.moveTo((250, 0))
+    pen.lineTo((350, 0))
+    pen.lineTo((580, 700))
+    pen.lineTo((20, 700))
+    pen.closePath()
+
+    cache = MarginsCache(font, OpticalBackend())
+    before = cache.measure([glyph])
+    font.info.unitsPerEm = 2000
+    font.info.xHeight = 400
+    assert cache.measure([glyph]) == OpticalBackend().measure([glyph]) != before
+    assert cache.misses == 2
+    font.info.unitsPerEm = 1000
+    font.info.xHeight = 500
+    assert cache.measure([glyph]) == before
+    assert cache.misses == 2
+
+def test_opticalZoneResolvedOncePerBatch(font, monkeypatch):
+    backend = OpticalBackend()
+    calls = []
+    getFontZone = backend._getFontZone
+    monkeypatch.setattr(backend, '_getFontZone', lambda font: calls.append(font) or getFontZone(font))
+    margins = backend.measure([font[glyphName] for glyphName in 'nmho'])
+    assert len(calls) == 1
+    assert margins == [backend.measureGlyph(font[glyphName]) for glyphName in 'nmho']
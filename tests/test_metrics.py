@@ -0,0 +1,18 @@
+import pytest
+from groupSpacingCore.undo import SpacingUndo
+
+def test_planAndApply(font):
+    pytest.importorskip('numpy')
+    from groupSpacingCore.metrics import MetricsTable
+    layerName = font.defaultLayer.name
+    table = MetricsTable(font)
+    plan = table.planGroupDeltas()
+    assert sorted(plan) == [('h', layerName, 'left', 10.0), ('m', layerName, 'left', -10.0), ('n', layerName, 'right', -10.0)]
+
+    undo = SpacingUndo(font)
+    table.apply(plan, undo=undo)
+    assert table.planGroupDeltas() == []
+    assert (font['m'].leftMargin, font['h'].leftMargin, font['n'].rightMargin) == (50, 50, 40)
+
+    undo.revert()
+    assert (font['m'].leftMargin, font['h'].leftMargin, font['n'].rightMargin) == (60, 40, 50)
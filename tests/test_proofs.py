@@ -0,0 +1,17 @@
+import os
+import pytest
+from groupSpacingProofs import renderGroupProofs, renderContactSheet
+
+def test_proofFileNamesAreUnique(font, tmp_path):
+    pytest.importorskip('fontTools')
+    font.groups['public.kern2.N'] = ('n',)
+    font.groups['public.kern1.a/b'] = ('o',)
+    files = renderGroupProofs(font, str(tmp_path))
+    assert len(set(name.lower() for name in files)) == len(font.groups) == 4
+    assert sorted(os.listdir(str(tmp_path))) == sorted(os.path.basename(filePath) for filePath in files)
+
+def test_contactSheet(font, tmp_path):
+    filePath = renderContactSheet(font, str(tmp_path / 'sheet.svg'))
+    with open(filePath, encoding='utf-8') as f:
+        svg = f.read()
+    assert svg.count('<use ') == 5
@@ -0,0 +1,62 @@
+from groupSpacingCore.undo import SpacingUndo, SpacingUndoStack, shiftMargin, registerUndo
+
+def test_shiftMargin(font):
+    shiftMargin(font['n'], 'left', 10)
+    shiftMargin(font['n'], 'right', -5)
+    assert (font['n'].leftMargin, font['n'].rightMargin, font['n'].width) == (60, 45, 505)
+
+def test_undoStack(font):
+    layerName = font.defaultLayer.name
+    undo = SpacingUndo(font, 'shift')
+    shiftMargin(font['m'], 'left', -10)
+    undo.add('m', layerName, 'left', -10)
+
+    stack = SpacingUndoStack()
+    stack.push(undo)
+    assert stack.canUndo() and not stack.canRedo()
+    stack.undo()
+    assert font['m'].leftMargin == 60
+    stack.redo()
+    assert font['m'].leftMargin == 50
+
+class UndoManager:
+
+    '''A minimal stand-in for `NSUndoManager`.'''
+
+    def __init__(self):
+        self.undoing = False
+        self.undoActions = []
+        self.redoActions = []
+
+    def registerUndoWithTarget_handler_(self, target, handler):
+        (self.redoActions if self.undoing else self.undoActions).append((target, handler))
+
+    def setActionName_(self, name):
+        self.actionName = name
+
+    def undo(self):
+        target, handler = self.undoActions.pop()
+        self.undoing = True
+        handler(target)
+        self.undoing = False
+
+    def redo(self):
+        target, handler = self.redoActions.pop()
+        handler(target)
+
+def test_registerUndo(font):
+    undo = SpacingUndo(font, 'shift')
+    shiftMargin(font['m'], 'left', -10)
+    undo.add('m', font.defaultLayer.name, 'left', -10)
+
+    changes = []
+    undoManager = UndoManager()
+    registerUndo(undo, undoManager, font, callback=changes.append)
+    assert undoManager.actionName == 'shift'
+    undoManager.undo()
+    assert font['m'].leftMargin == 60
+    undoManager.redo()
+    assert font['m'].leftMargin == 50
+    undoManager.undo()
+    assert font['m'].leftMargin == 60
+    assert changes == [undo, undo, undo]